@@ -0,0 +1,122 @@
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_discord import FIRST_MEMBER_ID, FakeDiscordBackend, connect
+
+for key in ('GUILD_ID', 'HELPER_ROLE_ID', 'LOG_CHANNEL_ID', 'PANEL_CHANNEL_ID', 'GOVERNMENT', 'LAWMAN', 'MEDIC'):
+    os.environ.setdefault(key, '0')
+
+import discord
+import bot
+
+
+async def sequential_loop(guild, role, action, user_ids, reason):
+    success_list = []
+    failed_list = []
+
+    for user_id in user_ids:
+        try:
+            member = await guild.fetch_member(int(user_id))
+
+            if member.bot:
+                failed_list.append(f"{member.mention} (cannot manage bots)")
+                continue
+
+            if member.top_role >= guild.me.top_role:
+                failed_list.append(f"{member.mention} (higher role than bot)")
+                continue
+
+            if action == "give":
+                if role in member.roles:
+                    failed_list.append(f"{member.mention} (already has role)")
+                    continue
+                await member.add_roles(role, reason=reason)
+            else:
+                if role not in member.roles:
+                    failed_list.append(f"{member.mention} (no role to remove)")
+                    continue
+                await member.remove_roles(role, reason=reason)
+
+            success_list.append(member.mention)
+
+        except discord.Forbidden:
+            failed_list.append(f"<@{user_id}> (permission denied)")
+        except discord.HTTPException:
+            failed_list.append(f"<@{user_id}> (network error)")
+
+    return success_list, failed_list
+
+
+async def measure(name, runner, guild, role, batch, rounds):
+    timings = []
+    for index in range(rounds):
+        user_ids = [str(FIRST_MEMBER_ID + index * batch + offset) for offset in range(batch)]
+        for action in ("give", "remove"):
+            started = time.perf_counter()
+            success_list, failed_list = await runner(guild, role, action, user_ids, "benchmark")
+            timings.append(time.perf_counter() - started)
+            assert len(success_list) == batch, (name, failed_list)
+    return timings
+
+
+async def main(args):
+    backend = FakeDiscordBackend(
+        latency=args.latency,
+        bucket_limit=args.bucket_limit,
+        bucket_window=args.bucket_window,
+    )
+    role_ids = backend.populate(args.batch * args.rounds)
+    await backend.start()
+    client, guild = await connect(backend, include_members=args.cached)
+    role = guild.get_role(role_ids['LAWMAN'])
+
+    executor = bot.BulkRoleExecutor(concurrency=args.concurrency)
+    resolver = bot.MemberResolver()
+
+    async def resolved_run(guild, role, action, user_ids, reason):
+        members = await resolver.resolve(guild, user_ids)
+        return await executor.run(guild, role, action, user_ids, reason, members=members)
+
+    runners = [
+        ("sequential", sequential_loop),
+        (f"executor (concurrency={args.concurrency})", executor.run),
+    ]
+    if args.cached:
+        runners.append(("resolver + executor", resolved_run))
+
+    print(f"batch={args.batch} rounds={args.rounds} latency={args.latency * 1000:.0f}ms "
+          f"bucket={args.bucket_limit}/{args.bucket_window}s cached={args.cached}")
+    try:
+        for name, runner in runners:
+            backend.calls.clear()
+            backend.rate_limited.clear()
+            timings = await measure(name, runner, guild, role, args.batch, args.rounds)
+            print(
+                f"{name:<32} mean={statistics.mean(timings) * 1000:8.1f}ms "
+                f"max={max(timings) * 1000:8.1f}ms "
+                f"rest={sum(backend.calls.values()):5d} "
+                f"429s={sum(backend.rate_limited.values()):4d}"
+            )
+        if args.cached:
+            print(f"resolver cache hits={resolver.cache_hits} misses={resolver.misses}")
+    finally:
+        await client.close()
+        await backend.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the sequential role loop with BulkRoleExecutor")
+    parser.add_argument("--batch", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--bucket-limit", type=int, default=50)
+    parser.add_argument("--bucket-window", type=float, default=1.0)
+    parser.add_argument("--concurrency", type=int, default=bot.BULK_CONCURRENCY)
+    parser.add_argument("--cached", action="store_true", help="preload the member cache like intents.members does")
+    asyncio.run(main(parser.parse_args()))
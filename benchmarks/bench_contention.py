@@ -0,0 +1,83 @@
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+from bench_scenarios import MANAGED_ROLES, bot
+from fake_discord import FIRST_MEMBER_ID, GUILD_ID, FakeDiscordBackend, connect
+
+
+class UngatedOperations(bot.RoleOperationGate):
+    async def run(self, guild_id, member_id, role_id, action, operation):
+        return await operation()
+
+
+def helper_actions(helpers, pattern):
+    if pattern == "identical":
+        return ["give"] * helpers
+    return ["give" if index % 2 == 0 else "remove" for index in range(helpers)]
+
+
+async def simulate(backend, guild, role, helpers, batch, pattern):
+    user_ids = [FIRST_MEMBER_ID + offset for offset in range(batch)]
+    members = {member.id: member for member in map(guild.get_member, user_ids)}
+    for user_id in user_ids:
+        member = members[user_id]
+        if member.get_role(role.id) is not None:
+            await member.remove_roles(role)
+    bot.role_gate.known.clear()
+
+    executor = bot.BulkRoleExecutor()
+    calls_before = backend.calls['member_role']
+    started = time.perf_counter()
+    results = await asyncio.gather(*(
+        executor.run(guild, role, action, user_ids, f"helper {index}", members=members)
+        for index, action in enumerate(helper_actions(helpers, pattern))
+    ))
+    elapsed = time.perf_counter() - started
+
+    outcomes = Counter()
+    for success_list, failed_list in results:
+        outcomes['success'] += len(success_list)
+        for text in failed_list:
+            outcomes[text.split('(', 1)[-1].rstrip(')')] += 1
+    return elapsed, backend.calls['member_role'] - calls_before, outcomes
+
+
+async def main(args):
+    backend = FakeDiscordBackend(latency=args.latency, bucket_limit=args.bucket_limit)
+    backend.populate(args.batch, MANAGED_ROLES)
+    await backend.start()
+    client, guild = await connect(backend, include_members=True, client=bot.bot)
+    bot.membership_index.build(guild)
+    role = guild.get_role(bot.guild_configs.get(GUILD_ID).roles['LAWMAN'])
+
+    print(f"helpers={args.helpers} batch={args.batch} latency={args.latency * 1000:.0f}ms")
+    try:
+        for pattern in ("identical", "conflicting"):
+            for name, gate in (("ungated", UngatedOperations()), ("gated", bot.RoleOperationGate())):
+                bot.role_gate = gate
+                elapsed, rest_calls, outcomes = await simulate(
+                    backend, guild, role, args.helpers, args.batch, pattern
+                )
+                print(f"{pattern:<12} {name:<8} time={elapsed * 1000:7.1f}ms rest={rest_calls:4d} "
+                      f"dedup={gate.deduplicated:4d} contended={gate.contended:4d} {dict(outcomes)}")
+                if name == "gated":
+                    assert not gate.locks and not gate.inflight, "gate leaked keys"
+                    if pattern == "identical":
+                        assert rest_calls == args.batch, rest_calls
+                        assert outcomes['success'] == args.helpers * args.batch, outcomes
+                    else:
+                        assert rest_calls == outcomes['success'] - gate.deduplicated, (rest_calls, outcomes)
+    finally:
+        await client.close()
+        await backend.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate helpers changing the same members at the same time")
+    parser.add_argument("--helpers", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--bucket-limit", type=int, default=1000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,211 @@
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_discord import (
+    ADMIN_ROLE_ID, ADMIN_USER_ID, CHANNEL_ID, FIRST_MEMBER_ID, FIRST_ROLE_ID, GUILD_ID,
+    FakeDiscordBackend, connect, load_guild
+)
+
+MANAGED_ROLES = ('GOVERNMENT', 'LAWMAN', 'MEDIC')
+os.environ.update({
+    'GUILD_ID': str(GUILD_ID),
+    'HELPER_ROLE_ID': str(ADMIN_ROLE_ID),
+    'LOG_CHANNEL_ID': str(CHANNEL_ID),
+    'PANEL_CHANNEL_ID': str(CHANNEL_ID),
+    'METRICS_PORT': '0',
+    'LOG_COALESCE_WINDOW': '0.1',
+})
+for position, name in enumerate(MANAGED_ROLES, start=1):
+    os.environ[name] = str(FIRST_ROLE_ID + position)
+os.chdir(tempfile.mkdtemp(prefix="rolebot-bench-"))
+
+import bot
+
+APPLICATION_COMMAND = 2
+MESSAGE_COMPONENT = 3
+STRING_SELECT = 3
+USER_SELECT = 5
+PANEL_BATCH = 3
+
+
+async def wait_for_background():
+    while bot.bulk_jobs.active:
+        await asyncio.sleep(0.005)
+    await bot.log_sink.queue.join()
+
+
+async def panel_select(backend, guild, index):
+    role_id = int(os.environ['LAWMAN'])
+    panel = bot.guild_configs.get(GUILD_ID).panel()
+    interaction = discord_interaction(backend, MESSAGE_COMPONENT, {
+        'custom_id': f"{panel.custom_id}:give",
+        'component_type': STRING_SELECT,
+        'values': [f"give_{role_id}"],
+    })
+    await bot.RoleManagementView(panel).role_select_callback(interaction)
+
+
+async def panel_bulk(backend, guild, index):
+    role_id = int(os.environ['LAWMAN'])
+    groups = max(len(backend.members) // PANEL_BATCH - 1, 1)
+    group = index % groups
+    action = "give" if (index // groups) % 2 == 0 else "remove"
+    user_ids = [str(FIRST_MEMBER_ID + group * PANEL_BATCH + offset) for offset in range(PANEL_BATCH)]
+
+    select = bot.MemberSelect(action, role_id, ADMIN_USER_ID)
+    interaction = discord_interaction(backend, MESSAGE_COMPONENT, {
+        'custom_id': select.item.custom_id,
+        'component_type': USER_SELECT,
+        'values': user_ids,
+    })
+    await select.callback(interaction)
+    while bot.bulk_jobs.active:
+        await asyncio.sleep(0.002)
+
+
+def command_scenario(name):
+    async def run(backend, guild, index):
+        interaction = discord_interaction(backend, APPLICATION_COMMAND, {
+            'id': str(backend.snowflake()),
+            'name': name,
+            'type': 1,
+            'options': [],
+        })
+        await bot.bot.tree.get_command(name).callback(interaction)
+    return run
+
+
+def prefix_scenario(name):
+    async def run(backend, guild, index):
+        channel = guild.get_channel(CHANNEL_ID)
+        message = bot.discord.Message(
+            state=bot.bot._connection,
+            channel=channel,
+            data=backend.user_message_payload(f"!{name}")
+        )
+        await bot.bot.process_commands(message)
+    return run
+
+
+SCENARIOS = {
+    'panel_select': panel_select,
+    'panel_bulk': panel_bulk,
+    'list_roles': command_scenario('list_roles'),
+    'role_stats': command_scenario('role_stats'),
+    'prefix_rek': prefix_scenario('rek'),
+    'prefix_rumah': prefix_scenario('rumah'),
+    'prefix_formkuda': prefix_scenario('formkuda'),
+}
+
+
+def discord_interaction(backend, interaction_type, data):
+    return bot.discord.Interaction(
+        data=backend.interaction_payload(interaction_type, data),
+        state=bot.bot._connection
+    )
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+async def run_scenario(backend, guild, runner, operations, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    timings = []
+    errors = Counter()
+
+    async def one(index):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await runner(backend, guild, index)
+            except Exception as e:
+                errors[type(e).__name__] += 1
+            timings.append(time.perf_counter() - started)
+
+    await wait_for_background()
+    calls_before = Counter(backend.calls)
+    limited_before = Counter(backend.rate_limited)
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(operations)))
+    elapsed = time.perf_counter() - started
+    await wait_for_background()
+
+    calls = Counter(backend.calls)
+    calls.subtract(calls_before)
+    limited = Counter(backend.rate_limited)
+    limited.subtract(limited_before)
+    return timings, elapsed, +calls, sum(limited.values()), errors
+
+
+async def load_size(backend, size):
+    role_ids = backend.populate(size, MANAGED_ROLES, role_every={'GOVERNMENT': 11, 'MEDIC': 7})
+    started = time.perf_counter()
+    guild = load_guild(backend, bot.bot, include_members=True)
+    bot.membership_index.build(guild)
+    bot.authorization.build(guild)
+    bot.role_gate.reset(guild.id)
+    bot.embed_cache.clear()
+    for role_id in role_ids.values():
+        bot.member_browser.invalidate_role(role_id)
+    return guild, time.perf_counter() - started
+
+
+async def main(args):
+    backend = FakeDiscordBackend(
+        latency=args.latency,
+        bucket_limit=args.bucket_limit,
+        bucket_window=args.bucket_window,
+    )
+    backend.populate(0, MANAGED_ROLES)
+    await backend.start()
+    await connect(backend, client=bot.bot)
+    bot.bulk_jobs.start()
+    bot.log_sink.start()
+
+    scenarios = args.scenarios.split(",") if args.scenarios else list(SCENARIOS)
+    print(f"latency={args.latency * 1000:.0f}ms bucket={args.bucket_limit}/{args.bucket_window}s "
+          f"operations={args.operations} concurrency={args.concurrency}")
+    try:
+        for size in map(int, args.sizes.split(",")):
+            guild, load_time = await load_size(backend, size)
+            print(f"\nguild_size={size} (cache + index build {load_time * 1000:.0f}ms)")
+            print(f"{'scenario':<16} {'p50':>9} {'p99':>9} {'mean':>9} {'ops/s':>8} {'rest/op':>8} {'429s':>5}  calls")
+            for name in scenarios:
+                timings, elapsed, calls, limited, errors = await run_scenario(
+                    backend, guild, SCENARIOS[name], args.operations, args.concurrency
+                )
+                routes = " ".join(f"{route}={count}" for route, count in sorted(calls.items()))
+                print(
+                    f"{name:<16} {percentile(timings, 0.5) * 1000:7.1f}ms {percentile(timings, 0.99) * 1000:7.1f}ms "
+                    f"{statistics.mean(timings) * 1000:7.1f}ms {len(timings) / elapsed:8.1f} "
+                    f"{sum(calls.values()) / len(timings):8.2f} {limited:5d}  {routes}"
+                )
+                if errors:
+                    print(f"{'':<16} errors: {dict(errors)}")
+                mismatches = bot.membership_index.verify(guild)
+                assert not mismatches, f"membership index drifted after {name}: {mismatches}"
+    finally:
+        await bot.bot.close()
+        await backend.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run bot scenarios against an in-process fake Discord backend")
+    parser.add_argument("--sizes", default="100,1000,10000", help="comma separated guild sizes (up to 100000)")
+    parser.add_argument("--scenarios", default="", help=f"comma separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--operations", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--bucket-limit", type=int, default=50)
+    parser.add_argument("--bucket-window", type=float, default=1.0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,124 @@
+import argparse
+import asyncio
+import time
+
+from bench_scenarios import bot
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def advance(self, seconds: float):
+        self.now += seconds
+
+
+async def check_expiry(state, advance, ttl):
+    assert await state.claim("selection:a", "first", ttl)
+    assert not await state.claim("selection:a", "second", ttl)
+    await advance(ttl * 0.5)
+    assert not await state.claim("selection:a", "second", ttl)
+    await advance(ttl * 0.6)
+    assert await state.claim("selection:a", "second", ttl)
+
+    await state.set("panel", {'message_id': 1, 'roles': ["A", "B"]})
+    await state.set("cooldown", "short", ttl=ttl)
+    await advance(ttl * 1.1)
+    assert await state.get("cooldown") is None
+    assert await state.get("panel") == {'message_id': 1, 'roles': ["A", "B"]}
+    await state.delete("panel")
+    assert await state.get("panel") is None
+
+
+async def check_renewal(state, advance, ttl):
+    assert await state.claim("job:1", "owner", ttl)
+    await advance(ttl * 0.75)
+    assert await state.claim("job:1", "owner", ttl)
+    await advance(ttl * 0.75)
+    await state.set("other", 1, ttl=ttl * 0.1)
+    assert await state.get("job:1") == "owner", "renewed lease expired at its old deadline"
+    assert not await state.claim("job:1", "intruder", ttl)
+    await state.release("job:1", "intruder")
+    assert await state.get("job:1") == "owner", "release by another owner dropped the lease"
+    await state.release("job:1", "owner")
+    assert await state.get("job:1") is None
+
+
+async def check_lock(state, ttl):
+    order = []
+
+    async def hold(name):
+        async with state.lock("member:1:2:3", ttl=ttl, poll=0.01):
+            order.append(f"{name}+")
+            await asyncio.sleep(0.02)
+            order.append(f"{name}-")
+
+    await asyncio.gather(hold("a"), hold("b"))
+    assert order in (["a+", "a-", "b+", "b-"], ["b+", "b-", "a+", "a-"]), order
+    assert await state.get("member:1:2:3") is None, "lock was not released"
+
+
+async def check_capacity(selections: int, rate: float):
+    clock = FakeClock()
+    state = bot.MemoryState(clock)
+    live = int(bot.SELECTION_DEDUP_TTL * rate) + 1
+    peak = 0
+    started = time.perf_counter()
+    for index in range(selections):
+        assert await state.claim(f"selection:{index}", str(index), bot.SELECTION_DEDUP_TTL)
+        async with state.lock(f"member:1:{index}:2"):
+            pass
+        await clock.advance(1 / rate)
+        peak = max(peak, len(state.values))
+    elapsed = time.perf_counter() - started
+    assert peak <= live, (peak, live)
+    assert len(state.deadlines) <= live + 1 + int(bot.MEMBER_LOCK_TTL * rate), len(state.deadlines)
+    return elapsed, peak, live
+
+
+async def check_backend(name, state, advance, ttl):
+    started = time.perf_counter()
+    await check_expiry(state, advance, ttl)
+    await check_renewal(state, advance, ttl)
+    await check_lock(state, ttl)
+    print(f"{name:<8} expiry, renewal and lock checks passed ({(time.perf_counter() - started) * 1000:.0f}ms)")
+
+
+async def main(args):
+    clock = FakeClock()
+    await check_backend("memory", bot.MemoryState(clock), clock.advance, bot.JOB_LEASE_SECONDS)
+
+    if args.redis:
+        redis_state = bot.RedisState(args.redis, prefix="rolebot-bench:")
+    elif fakeredis is not None:
+        redis_state = bot.RedisState(client=fakeredis.FakeAsyncRedis(), prefix="rolebot-bench:")
+    else:
+        redis_state = None
+        print("redis    skipped: pass --redis URL or install fakeredis[lua]")
+    if redis_state is not None:
+        await redis_state.open()
+        try:
+            await check_backend("redis", redis_state, asyncio.sleep, args.redis_ttl)
+        finally:
+            await redis_state.close()
+
+    elapsed, peak, live = await check_capacity(args.selections, args.rate)
+    print(f"selections={args.selections} rate={args.rate:.0f}/s time={elapsed * 1000:.1f}ms "
+          f"ops/s={args.selections / elapsed:.0f} peak_keys={peak} live_limit={live}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check shared state expiry, renewal and locking")
+    parser.add_argument("--selections", type=int, default=100000)
+    parser.add_argument("--rate", type=float, default=50.0)
+    parser.add_argument("--redis", default="", help="redis:// URL to check instead of the fakeredis stand-in")
+    parser.add_argument("--redis-ttl", type=float, default=0.3, help="TTL in seconds for the real-time Redis checks")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,64 @@
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+from bench_scenarios import MANAGED_ROLES, bot
+from fake_discord import GUILD_ID, FakeDiscordBackend, connect
+
+PANEL = bot.guild_configs.get(GUILD_ID).panel()
+
+
+async def legacy_on_ready():
+    await bot.restore_panel(PANEL)
+    await bot.bulk_jobs.resume()
+    guild = bot.discord.Object(id=PANEL.guild_id)
+    bot.bot.tree.copy_global_to(guild=guild)
+    await bot.bot.tree.sync(guild=guild)
+
+
+async def current_on_ready():
+    bot.bot.initialized = False
+    await bot.on_ready()
+
+
+async def measure(backend, runner, rounds):
+    timings = []
+    calls_before = Counter(backend.calls)
+    for _ in range(rounds):
+        started = time.perf_counter()
+        await runner()
+        timings.append(time.perf_counter() - started)
+    calls = Counter(backend.calls)
+    calls.subtract(calls_before)
+    return timings, +calls
+
+
+async def main(args):
+    backend = FakeDiscordBackend(latency=args.latency)
+    backend.populate(args.guild_size, MANAGED_ROLES, role_every={'GOVERNMENT': 11, 'MEDIC': 7})
+    await backend.start()
+    await connect(backend, include_members=True, client=bot.bot)
+
+    panel_message_id = backend.snowflake()
+    backend.messages.add(panel_message_id)
+    await bot.panel_data.set_message_id(PANEL, panel_message_id)
+
+    print(f"guild_size={args.guild_size} latency={args.latency * 1000:.0f}ms rounds={args.rounds}")
+    try:
+        for name, runner in (("sequential, always sync", legacy_on_ready), ("concurrent, hashed sync", current_on_ready)):
+            timings, calls = await measure(backend, runner, args.rounds)
+            routes = " ".join(f"{route}={count}" for route, count in sorted(calls.items()))
+            print(f"{name:<26} first={timings[0] * 1000:7.1f}ms "
+                  f"restart={sum(timings[1:]) / max(len(timings) - 1, 1) * 1000:7.1f}ms  {routes}")
+    finally:
+        await bot.bot.close()
+        await backend.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the old and new on_ready startup paths")
+    parser.add_argument("--guild-size", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,393 @@
+import asyncio
+import json
+import time
+from collections import Counter
+
+import discord
+from aiohttp import web
+
+
+GUILD_ID = 100000000000000001
+BOT_USER_ID = 100000000000000002
+BOT_ROLE_ID = 100000000000000003
+ADMIN_ROLE_ID = 100000000000000004
+ADMIN_USER_ID = 100000000000000005
+CHANNEL_ID = 100000000000000006
+FIRST_MEMBER_ID = 200000000000000000
+FIRST_ROLE_ID = 300000000000000000
+
+
+def user_payload(user_id: int, bot: bool = False):
+    return {
+        'id': str(user_id),
+        'username': f"user{user_id % 1000000}",
+        'discriminator': '0',
+        'global_name': None,
+        'avatar': None,
+        'bot': bot,
+    }
+
+
+def role_payload(role_id: int, name: str, position: int, permissions: int = 0):
+    return {
+        'id': str(role_id),
+        'name': name,
+        'color': 0,
+        'hoist': False,
+        'position': position,
+        'permissions': str(permissions),
+        'managed': False,
+        'mentionable': False,
+    }
+
+
+def channel_payload(channel_id: int):
+    return {
+        'id': str(channel_id),
+        'type': 0,
+        'guild_id': str(GUILD_ID),
+        'name': 'bench',
+        'position': 0,
+        'permission_overwrites': [],
+        'nsfw': False,
+        'parent_id': None,
+    }
+
+
+def json_response(data, status: int = 200, headers=None):
+    return web.Response(
+        body=json.dumps(data).encode(),
+        status=status,
+        headers={'Content-Type': 'application/json', **(headers or {})},
+    )
+
+
+class FakeBucket:
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self.remaining = limit
+        self.reset_at = time.monotonic() + window
+
+    def take(self):
+        now = time.monotonic()
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + self.window
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+
+class FakeDiscordBackend:
+    def __init__(self, latency: float = 0.05, bucket_limit: int = 10, bucket_window: float = 1.0):
+        self.latency = latency
+        self.bucket_limit = bucket_limit
+        self.bucket_window = bucket_window
+        self.buckets = {}
+        self.calls = Counter()
+        self.rate_limited = Counter()
+        self.roles = {}
+        self.members = {}
+        self.messages = set()
+        self.runner = None
+        self.base_url = None
+        self.state = None
+        self.next_id = 400000000000000000
+
+    def snowflake(self) -> int:
+        self.next_id += 1
+        return self.next_id
+
+    def add_role(self, role_id: int, name: str, position: int, permissions: int = 0):
+        self.roles[role_id] = role_payload(role_id, name, position, permissions)
+
+    def add_member(self, user_id: int, roles=(), bot: bool = False):
+        self.members[user_id] = {
+            'user': user_payload(user_id, bot),
+            'roles': [str(role_id) for role_id in roles],
+            'nick': None,
+            'joined_at': '2024-01-01T00:00:00+00:00',
+            'deaf': False,
+            'mute': False,
+            'flags': 0,
+        }
+
+    def guild_payload(self, include_members: bool = False):
+        return {
+            'id': str(GUILD_ID),
+            'name': 'Benchmark Guild',
+            'owner_id': str(BOT_USER_ID),
+            'roles': list(self.roles.values()),
+            'emojis': [],
+            'stickers': [],
+            'features': [],
+            'member_count': len(self.members),
+            'members': list(self.members.values()) if include_members else [self.members[BOT_USER_ID]],
+            'channels': [channel_payload(CHANNEL_ID)],
+            'threads': [],
+        }
+
+    def populate(self, guild_size: int, managed_roles=('GOVERNMENT', 'LAWMAN', 'MEDIC'), role_every=None):
+        self.roles.clear()
+        self.members.clear()
+        self.add_role(GUILD_ID, '@everyone', 0)
+        self.add_role(ADMIN_ROLE_ID, 'Admin', len(managed_roles) + 1, permissions=8)
+        self.add_role(BOT_ROLE_ID, 'Role Bot', len(managed_roles) + 2)
+        role_ids = {}
+        for position, name in enumerate(managed_roles, start=1):
+            role_ids[name] = FIRST_ROLE_ID + position
+            self.add_role(role_ids[name], name, position)
+        self.add_member(BOT_USER_ID, roles=[BOT_ROLE_ID], bot=True)
+        self.add_member(ADMIN_USER_ID, roles=[ADMIN_ROLE_ID])
+        for index in range(guild_size):
+            roles = [
+                role_ids[name] for name, every in (role_every or {}).items()
+                if index % every == 0
+            ]
+            self.add_member(FIRST_MEMBER_ID + index, roles=roles)
+        return role_ids
+
+    def message_payload(self, data: dict, message_id: int = None, channel_id: int = CHANNEL_ID):
+        return {
+            'id': str(message_id or self.snowflake()),
+            'channel_id': str(channel_id),
+            'author': user_payload(BOT_USER_ID, bot=True),
+            'content': data.get('content') or '',
+            'timestamp': '2024-01-01T00:00:00+00:00',
+            'edited_timestamp': None,
+            'tts': False,
+            'mention_everyone': False,
+            'mentions': [],
+            'mention_roles': [],
+            'attachments': [],
+            'embeds': data.get('embeds') or [],
+            'pinned': False,
+            'type': 0,
+            'flags': data.get('flags') or 0,
+        }
+
+    def interaction_payload(self, interaction_type: int, data: dict, user_id: int = ADMIN_USER_ID):
+        interaction_id = self.snowflake()
+        return {
+            'id': str(interaction_id),
+            'application_id': str(BOT_USER_ID),
+            'type': interaction_type,
+            'token': f"{'t' * 40}{interaction_id}",
+            'version': 1,
+            'guild_id': str(GUILD_ID),
+            'channel_id': str(CHANNEL_ID),
+            'channel': channel_payload(CHANNEL_ID),
+            'member': {**self.members[user_id], 'permissions': '8'},
+            'data': data,
+            'app_permissions': '8',
+            'locale': 'en-US',
+            'guild_locale': 'en-US',
+            'entitlements': [],
+            'authorizing_integration_owners': {},
+            'context': 0,
+            'attachment_size_limit': 8 * 1024 * 1024,
+        }
+
+    def user_message_payload(self, content: str, user_id: int = ADMIN_USER_ID):
+        member = self.members[user_id]
+        return {
+            **self.message_payload({'content': content}),
+            'author': member['user'],
+            'member': {key: value for key, value in member.items() if key != 'user'},
+            'guild_id': str(GUILD_ID),
+        }
+
+    async def respond(self, request: web.Request, bucket_name: str, handler):
+        self.calls[bucket_name] += 1
+        await asyncio.sleep(self.latency)
+
+        bucket = self.buckets.get(bucket_name)
+        if bucket is None:
+            bucket = self.buckets[bucket_name] = FakeBucket(self.bucket_limit, self.bucket_window)
+
+        reset_after = max(bucket.reset_at - time.monotonic(), 0.001)
+        if not bucket.take():
+            self.rate_limited[bucket_name] += 1
+            return json_response(
+                {'message': 'You are being rate limited.', 'retry_after': reset_after, 'global': False},
+                status=429,
+                headers={'Via': '1.1 fake', 'Retry-After': f"{reset_after:.3f}"},
+            )
+
+        response = handler(request)
+        if asyncio.iscoroutine(response):
+            response = await response
+        response.headers.update({
+            'X-RateLimit-Bucket': bucket_name,
+            'X-RateLimit-Limit': str(bucket.limit),
+            'X-RateLimit-Remaining': str(bucket.remaining),
+            'X-RateLimit-Reset-After': f"{reset_after:.3f}",
+        })
+        return response
+
+    def get_me(self, request):
+        return json_response(user_payload(BOT_USER_ID, bot=True))
+
+    def get_application(self, request):
+        return json_response({
+            'id': str(BOT_USER_ID),
+            'name': 'Role Bot',
+            'description': '',
+            'icon': None,
+            'bot_public': False,
+            'bot_require_code_grant': False,
+            'owner': user_payload(BOT_USER_ID),
+            'verify_key': '',
+            'flags': 0,
+        })
+
+    def get_member(self, request):
+        member = self.members.get(int(request.match_info['user_id']))
+        if member is None:
+            return json_response({'message': 'Unknown Member', 'code': 10007}, status=404)
+        return json_response(member)
+
+    def dispatch_member_update(self, member):
+        if self.state is not None:
+            self.state.parse_guild_member_update({**member, 'guild_id': str(GUILD_ID)})
+
+    def put_member_role(self, request):
+        member = self.members[int(request.match_info['user_id'])]
+        role_id = request.match_info['role_id']
+        if role_id not in member['roles']:
+            member['roles'].append(role_id)
+            self.dispatch_member_update(member)
+        return web.Response(status=204)
+
+    def delete_member_role(self, request):
+        member = self.members[int(request.match_info['user_id'])]
+        role_id = request.match_info['role_id']
+        if role_id in member['roles']:
+            member['roles'].remove(role_id)
+            self.dispatch_member_update(member)
+        return web.Response(status=204)
+
+    async def read_payload(self, request) -> dict:
+        if request.content_type.startswith('multipart/'):
+            form = await request.post()
+            return json.loads(form.get('payload_json') or '{}')
+        if request.can_read_body:
+            return await request.json()
+        return {}
+
+    async def interaction_callback(self, request):
+        body = await self.read_payload(request)
+        response_type = body.get('type')
+        data = body.get('data') or {}
+        interaction = {
+            'id': request.match_info['interaction_id'],
+            'type': 3,
+            'response_message_loading': response_type == 5,
+            'response_message_ephemeral': bool((data.get('flags') or 0) & 64),
+        }
+        resource = {'type': response_type}
+        if response_type in (4, 7):
+            message = self.message_payload(data)
+            interaction['response_message_id'] = message['id']
+            resource['message'] = message
+        return json_response({'interaction': interaction, 'resource': resource})
+
+    async def create_webhook_message(self, request):
+        return json_response(self.message_payload(await self.read_payload(request)))
+
+    async def edit_webhook_message(self, request):
+        message_id = request.match_info['message_id']
+        body = await self.read_payload(request)
+        return json_response(self.message_payload(body, None if message_id == '@original' else int(message_id)))
+
+    def delete_webhook_message(self, request):
+        return web.Response(status=204)
+
+    async def create_channel_message(self, request):
+        body = await self.read_payload(request)
+        return json_response(self.message_payload(body, channel_id=int(request.match_info['channel_id'])))
+
+    async def bulk_overwrite_commands(self, request):
+        commands = await self.read_payload(request)
+        return json_response([
+            {
+                **command,
+                'id': str(self.snowflake()),
+                'application_id': str(BOT_USER_ID),
+                'guild_id': request.match_info['guild_id'],
+                'version': str(self.snowflake()),
+            }
+            for command in commands
+        ])
+
+    def get_channel_message(self, request):
+        message_id = int(request.match_info['message_id'])
+        if message_id not in self.messages:
+            return json_response({'message': 'Unknown Message', 'code': 10008}, status=404)
+        return json_response(self.message_payload({}, message_id, int(request.match_info['channel_id'])))
+
+    async def edit_channel_message(self, request):
+        body = await self.read_payload(request)
+        message_id = int(request.match_info['message_id'])
+        return json_response(self.message_payload(body, message_id, int(request.match_info['channel_id'])))
+
+    async def start(self):
+        app = web.Application()
+        member_route = '/api/v10/guilds/{guild_id}/members/{user_id}'
+        role_route = member_route + '/roles/{role_id}'
+        app.router.add_get('/api/v10/users/@me', lambda r: self.respond(r, 'users/@me', self.get_me))
+        app.router.add_get('/api/v10/oauth2/applications/@me',
+                           lambda r: self.respond(r, 'applications/@me', self.get_application))
+        app.router.add_get(member_route, lambda r: self.respond(r, 'get_member', self.get_member))
+        app.router.add_put(role_route, lambda r: self.respond(r, 'member_role', self.put_member_role))
+        app.router.add_delete(role_route, lambda r: self.respond(r, 'member_role', self.delete_member_role))
+        app.router.add_post('/api/v10/interactions/{interaction_id}/{token}/callback',
+                            lambda r: self.respond(r, 'interaction_callback', self.interaction_callback))
+        webhook_route = '/api/v10/webhooks/{application_id}/{token}'
+        app.router.add_post(webhook_route, lambda r: self.respond(r, 'webhook_message', self.create_webhook_message))
+        app.router.add_patch(webhook_route + '/messages/{message_id}',
+                             lambda r: self.respond(r, 'webhook_message', self.edit_webhook_message))
+        app.router.add_delete(webhook_route + '/messages/{message_id}',
+                              lambda r: self.respond(r, 'webhook_message', self.delete_webhook_message))
+        app.router.add_post('/api/v10/channels/{channel_id}/messages',
+                            lambda r: self.respond(r, 'channel_message', self.create_channel_message))
+        message_route = '/api/v10/channels/{channel_id}/messages/{message_id}'
+        app.router.add_get(message_route, lambda r: self.respond(r, 'get_message', self.get_channel_message))
+        app.router.add_patch(message_route, lambda r: self.respond(r, 'channel_message', self.edit_channel_message))
+        app.router.add_put('/api/v10/applications/{application_id}/guilds/{guild_id}/commands',
+                           lambda r: self.respond(r, 'guild_commands', self.bulk_overwrite_commands))
+
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}/api/v10"
+        return self.base_url
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+
+
+async def connect(backend: FakeDiscordBackend, include_members: bool = False, client: discord.Client = None):
+    discord.http.Route.BASE = backend.base_url
+    if client is None:
+        intents = discord.Intents.default()
+        intents.members = True
+        client = discord.Client(intents=intents)
+    if not client.is_ready() and client.user is None:
+        await client.login('fake-token')
+    guild = load_guild(backend, client, include_members)
+    client._ready.set()
+    return client, guild
+
+
+def load_guild(backend: FakeDiscordBackend, client: discord.Client, include_members: bool = False):
+    state = client._connection
+    guild = discord.Guild(data=backend.guild_payload(include_members), state=state)
+    state._add_guild(guild)
+    backend.state = state
+    return guild
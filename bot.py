@@ -1,176 +1,2304 @@
 import discord
+import aiohttp
 from discord.ext import commands, tasks
 from discord import app_commands
 import os
 import json
+import time
+import itertools
+import csv
+import functools
+import threading
+import base64
+import io
+import re
+import heapq
+import hmac
+import hashlib
+import socket
+import contextlib
+import bisect
+from collections import OrderedDict
+import asyncio
+import sqlite3
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from datetime import datetime, timedelta
+from flask import Flask, Response
+from werkzeug.serving import WSGIRequestHandler, make_server
+from datetime import timedelta
 from typing import Optional
 
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:
+    redis_asyncio = None
+
+STARTED_AT = time.perf_counter()
+
 load_dotenv()
 
 BOT_TOKEN = os.getenv('BOT_TOKEN')
-GUILD_ID = int(os.getenv('GUILD_ID'))
-HELPER_ROLE_ID = int(os.getenv('HELPER_ROLE_ID'))
-LOG_CHANNEL_ID = int(os.getenv('LOG_CHANNEL_ID'))
-PANEL_CHANNEL_ID = int(os.getenv('PANEL_CHANNEL_ID'))
-
-MANAGEABLE_ROLES = {
-    'GOVERNMENT': int(os.getenv('GOVERNMENT')),
-    'LAWMAN': int(os.getenv('LAWMAN')),
-    'MEDIC': int(os.getenv('MEDIC')),
-}
+GUILD_CONFIG_FILE = os.getenv('GUILD_CONFIG_FILE', 'guilds.json')
+LEGACY_ROLE_NAMES = ('GOVERNMENT', 'LAWMAN', 'MEDIC')
 
 PANEL_DATA_FILE = 'panel_data.json'
+DATABASE_FILE = os.getenv('DATABASE_FILE', 'rolebot.db')
+PANEL_FLUSH_DELAY = float(os.getenv('PANEL_FLUSH_DELAY', 1.0))
+DEFAULT_PANEL = 'main'
+PANEL_ROLE_LIMIT = 25
+ROLE_LABEL_LIMIT = 88
+SELECT_TEXT_LIMIT = 100
+SELECTION_TOKEN_TTL = 600
+PANEL_SECRET = hashlib.sha256(f"panel:{os.getenv('PANEL_SECRET') or BOT_TOKEN}".encode()).digest()
+AUDIT_RETENTION = timedelta(days=int(os.getenv('AUDIT_RETENTION_DAYS', 180)))
+AUDIT_MAX_ROWS = int(os.getenv('AUDIT_MAX_ROWS', 500000))
+HISTORY_PAGE_SIZE = 10
+EMBED_CACHE_TTL = float(os.getenv('EMBED_CACHE_TTL', 300))
+BROWSER_PAGE_SIZE = 20
+BROWSER_PAGES_PER_VIEWER = 8
+BROWSER_MAX_VIEWERS = 256
+BROWSER_PREFIX_LIMIT = 32
+
+BULK_CONCURRENCY = int(os.getenv('BULK_CONCURRENCY', 5))
+BULK_BUCKET_CONCURRENCY = int(os.getenv('BULK_BUCKET_CONCURRENCY', 5))
+BULK_MAX_RETRIES = int(os.getenv('BULK_MAX_RETRIES', 3))
+BULK_JOB_WORKERS = int(os.getenv('BULK_JOB_WORKERS', 2))
+BULK_JOB_CHUNK_SIZE = 25
+BULK_JOB_PROGRESS_INTERVAL = 2.0
+BULK_JOB_RETENTION = timedelta(days=7)
+SCHEDULE_COALESCE_WINDOW = 1.0
+GRANT_DURATIONS = [1, 2, 4, 8, 12, 24, 48, 72, 168]
+BULK_UPLOAD_MAX_BYTES = 1024 * 1024
+RESULT_INLINE_LIMIT = int(os.getenv('RESULT_INLINE_LIMIT', 40))
+EMBED_FIELD_LIMIT = 1024
+EMBED_FIELD_COUNT = 25
+EMBED_TOTAL_LIMIT = 6000
+MESSAGE_EMBED_LIMIT = 10
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 200))
+LOG_COALESCE_WINDOW = float(os.getenv('LOG_COALESCE_WINDOW', 2.0))
+LOG_SPILL_FILE = os.getenv('LOG_SPILL_FILE', 'log_spill.jsonl')
+LOG_DRAIN_TIMEOUT = 10.0
+LOG_RETRY_DELAY = 30.0
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.getenv('METRICS_PORT', 9108))
+REST_ROUTE_IDS = re.compile(r"/(\d{15,}|[\w.-]{32,})")
+METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BULK_UPLOAD_MAX_ROWS = int(os.getenv('BULK_UPLOAD_MAX_ROWS', 5000))
+SHARED_STATE_URL = os.getenv('SHARED_STATE_URL', 'memory://')
+SHARED_STATE_PREFIX = os.getenv('SHARED_STATE_PREFIX', 'rolebot:')
+SHARD_COUNT = int(os.getenv('SHARD_COUNT', 0)) or None
+SHARD_IDS = [int(shard_id) for shard_id in os.getenv('SHARD_IDS', '').split(',') if shard_id.strip()] or None
+PROCESS_ID = f"{socket.gethostname()}:{os.getpid()}"
+JOB_LEASE_SECONDS = 120.0
+SHARD_RETRY_DELAY = 60.0
+MEMBER_LOCK_TTL = 30.0
+ROLE_STATE_TTL = 60.0
+SELECTION_DEDUP_TTL = 15.0
 
 intents = discord.Intents.default()
 intents.members = True
 intents.message_content = True
-bot = commands.Bot(command_prefix='!', intents=intents)
+
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    def __init__(self, buckets=METRICS_BUCKETS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.help = {}
+        self.types = {}
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.callbacks = []
+
+    def describe(self, name: str, kind: str, text: str):
+        self.types.setdefault(name, kind)
+        self.help.setdefault(name, text)
+
+    def inc(self, metric: str, value: float = 1, **labels):
+        key = (metric, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, metric: str, value: float, **labels):
+        with self.lock:
+            self.gauges[(metric, tuple(sorted(labels.items())))] = value
+
+    def observe(self, metric: str, value: float, **labels):
+        key = (metric, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram[0][index] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def register(self, name: str, kind: str, text: str, func):
+        self.describe(name, kind, text)
+        self.callbacks.append((name, func))
+
+    def render(self) -> str:
+        def labels_text(labels) -> str:
+            if not labels:
+                return ""
+            return "{" + ",".join(f'{key}="{escape_label(value)}"' for key, value in labels) + "}"
+
+        with self.lock:
+            values = list(self.counters.items()) + list(self.gauges.items())
+            histograms = [(key, list(counts), total, count) for key, (counts, total, count) in self.histograms.items()]
+
+        samples = {}
+        for (name, labels), value in values:
+            samples.setdefault(name, []).append(f"{name}{labels_text(labels)} {value}")
+        for name, func in self.callbacks:
+            try:
+                samples.setdefault(name, []).append(f"{name} {func()}")
+            except Exception:
+                continue
+        for (name, labels), counts, total, count in histograms:
+            lines = samples.setdefault(name, [])
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(f"{name}_bucket{labels_text(labels + (('le', bound),))} {bucket_count}")
+            lines.append(f"{name}_bucket{labels_text(labels + (('le', '+Inf'),))} {count}")
+            lines.append(f"{name}_sum{labels_text(labels)} {total}")
+            lines.append(f"{name}_count{labels_text(labels)} {count}")
+
+        output = []
+        for name in sorted(samples):
+            output.append(f"# HELP {name} {self.help.get(name, name)}")
+            output.append(f"# TYPE {name} {self.types.get(name, 'untyped')}")
+            output.extend(samples[name])
+        return "\n".join(output) + "\n"
+
+
+metrics = Metrics()
+metrics.describe("rolebot_handler_seconds", "histogram", "Time spent in commands, callbacks and background work")
+metrics.describe("rolebot_handler_calls_total", "counter", "Handler invocations by outcome")
+metrics.describe("rolebot_rest_request_seconds", "histogram", "Discord REST request latency")
+metrics.describe("rolebot_rest_requests_total", "counter", "Discord REST requests by status")
+metrics.describe("rolebot_rest_rate_limited_total", "counter", "Discord REST responses with status 429")
+metrics.describe("rolebot_role_lock_wait_seconds", "histogram", "Time role changes waited for a (member, role) lock")
+metrics.describe("rolebot_role_ops_deduplicated_total", "counter", "Role changes that joined an identical in-flight change")
+metrics.describe("rolebot_role_lock_contended_total", "counter", "Role changes that had to wait for a (member, role) lock")
+metrics.describe("rolebot_startup_seconds", "gauge", "Seconds from process start to the first on_ready completing")
+
+
+def timed(kind: str, name: Optional[str] = None):
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            outcome = "ok"
+            try:
+                return await func(*args, **kwargs)
+            except asyncio.CancelledError:
+                outcome = "cancelled"
+                raise
+            except Exception:
+                outcome = "error"
+                raise
+            finally:
+                metrics.observe("rolebot_handler_seconds", time.perf_counter() - started, kind=kind, handler=label)
+                metrics.inc("rolebot_handler_calls_total", kind=kind, handler=label, outcome=outcome)
+        return wrapper
+    return decorator
+
+
+def rest_trace_config() -> aiohttp.TraceConfig:
+    async def on_request_start(session, context, params):
+        context.started = time.perf_counter()
+
+    async def on_request_end(session, context, params):
+        route = REST_ROUTE_IDS.sub("/{id}", params.url.path)
+        status = params.response.status
+        metrics.observe("rolebot_rest_request_seconds", time.perf_counter() - context.started,
+                        method=params.method, route=route)
+        metrics.inc("rolebot_rest_requests_total", method=params.method, route=route, status=status)
+        if status == 429:
+            metrics.inc("rolebot_rest_rate_limited_total", method=params.method, route=route,
+                        scope=params.response.headers.get('X-RateLimit-Scope', 'unknown'))
+
+    async def on_request_exception(session, context, params):
+        metrics.inc("rolebot_rest_requests_total", method=params.method,
+                    route=REST_ROUTE_IDS.sub("/{id}", params.url.path), status="error")
+
+    trace = aiohttp.TraceConfig()
+    trace.on_request_start.append(on_request_start)
+    trace.on_request_end.append(on_request_end)
+    trace.on_request_exception.append(on_request_exception)
+    return trace
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def start_metrics_server(host: str, port: int):
+    app = Flask("rolebot_metrics")
+
+    @app.get("/metrics")
+    def scrape():
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+    server = make_server(host, port, app, threaded=True, request_handler=QuietRequestHandler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    print(f"📈 Metrics available at http://{host}:{server.server_port}/metrics")
+    return server
+
+
+class RoleBot(commands.AutoShardedBot):
+    metrics_server = None
+    initialized = False
+
+    async def setup_hook(self):
+        if METRICS_PORT:
+            self.metrics_server = start_metrics_server(METRICS_HOST, METRICS_PORT)
+        await asyncio.gather(storage.open(), shared_state.open())
+        await asyncio.gather(panel_data.load(), role_scheduler.load())
+        load_role_overrides()
+
+        for panel in guild_configs.panels():
+            self.add_view(panel_view(panel))
+        self.add_dynamic_items(MemberSelect, GrantDurationSelect, MemberBrowserButton, MemberBrowserRoleSelect)
+        audit_log.start_compaction()
+        bulk_jobs.start()
+        log_sink.start()
+
+    async def close(self):
+        role_scheduler.stop()
+        bulk_jobs.stop()
+        await log_sink.close()
+        await panel_data.flush()
+        await asyncio.gather(*background_tasks, return_exceptions=True)
+        await storage.close()
+        await shared_state.close()
+        if self.metrics_server is not None:
+            await asyncio.to_thread(self.metrics_server.shutdown)
+            self.metrics_server = None
+        await super().close()
+
+
+bot = RoleBot(
+    command_prefix='!',
+    intents=intents,
+    http_trace=rest_trace_config(),
+    shard_count=SHARD_COUNT,
+    shard_ids=SHARD_IDS
+)
+
+
+def spawn(coro) -> asyncio.Task:
+    task = asyncio.get_running_loop().create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+
+background_tasks = set()
+
+
+class StorageBackend(ABC):
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    @abstractmethod
+    async def load_panel_state(self) -> dict:
+        ...
+
+    @abstractmethod
+    async def save_panel_values(self, values):
+        ...
+
+    @abstractmethod
+    async def record_role_changes(self, entries):
+        ...
+
+    @abstractmethod
+    async def query_role_changes(self, guild_id: int, target_id: Optional[int] = None,
+                                 actor_id: Optional[int] = None, role_id: Optional[int] = None,
+                                 before_id: Optional[int] = None, limit: int = 10) -> list:
+        ...
+
+    @abstractmethod
+    async def prune_role_changes(self, older_than: float, max_rows: int) -> int:
+        ...
+
+    @abstractmethod
+    async def create_job(self, guild_id: int, actor_id: int, reason: str, items, rejected=()) -> int:
+        ...
+
+    @abstractmethod
+    async def update_job(self, job_id: int, **fields):
+        ...
+
+    @abstractmethod
+    async def load_job(self, job_id: int) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def load_unfinished_jobs(self) -> list:
+        ...
+
+    @abstractmethod
+    async def load_job_items(self, job_id: int) -> list:
+        ...
+
+    @abstractmethod
+    async def update_job_items(self, job_id: int, updates):
+        ...
+
+    @abstractmethod
+    async def prune_jobs(self, older_than: float) -> int:
+        ...
+
+    @abstractmethod
+    async def schedule_role_changes(self, entries) -> list:
+        ...
+
+    @abstractmethod
+    async def load_schedule(self) -> list:
+        ...
+
+    @abstractmethod
+    async def load_scheduled(self, ids) -> list:
+        ...
+
+    @abstractmethod
+    async def delete_scheduled(self, ids):
+        ...
+
+
+SQLITE_MIGRATIONS = [
+    """
+    CREATE TABLE panel_state (
+        panel TEXT NOT NULL,
+        key TEXT NOT NULL,
+        value TEXT,
+        PRIMARY KEY (panel, key)
+    );
+    CREATE TABLE pending_selections (
+        user_id INTEGER PRIMARY KEY,
+        data TEXT NOT NULL,
+        expires_at REAL NOT NULL
+    );
+    CREATE INDEX idx_pending_expires ON pending_selections (expires_at);
+    CREATE TABLE role_changes (
+        id INTEGER PRIMARY KEY,
+        created_at REAL NOT NULL,
+        guild_id INTEGER NOT NULL,
+        actor_id INTEGER NOT NULL,
+        target_id INTEGER NOT NULL,
+        role_id INTEGER NOT NULL,
+        action TEXT NOT NULL,
+        success INTEGER NOT NULL,
+        detail TEXT
+    );
+    CREATE INDEX idx_role_changes_target ON role_changes (target_id, created_at);
+    CREATE INDEX idx_role_changes_role ON role_changes (role_id, created_at);
+    CREATE INDEX idx_role_changes_created ON role_changes (created_at);
+    """,
+    """
+    DROP INDEX idx_role_changes_target;
+    DROP INDEX idx_role_changes_role;
+    CREATE INDEX idx_role_changes_target ON role_changes (guild_id, target_id);
+    CREATE INDEX idx_role_changes_actor ON role_changes (guild_id, actor_id);
+    CREATE INDEX idx_role_changes_role ON role_changes (guild_id, role_id);
+    """,
+    """
+    DROP TABLE pending_selections;
+    CREATE TABLE pending_selections (
+        user_id INTEGER NOT NULL,
+        message_id INTEGER NOT NULL,
+        data TEXT NOT NULL,
+        expires_at REAL NOT NULL,
+        PRIMARY KEY (user_id, message_id)
+    ) WITHOUT ROWID;
+    CREATE INDEX idx_pending_expires ON pending_selections (expires_at);
+    """,
+    """
+    DROP TABLE pending_selections;
+    """,
+    """
+    CREATE TABLE bulk_jobs (
+        id INTEGER PRIMARY KEY,
+        created_at REAL NOT NULL,
+        guild_id INTEGER NOT NULL,
+        actor_id INTEGER NOT NULL,
+        reason TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'queued',
+        application_id INTEGER,
+        interaction_token TEXT,
+        message_id INTEGER
+    );
+    CREATE INDEX idx_bulk_jobs_status ON bulk_jobs (status);
+    CREATE TABLE bulk_job_items (
+        job_id INTEGER NOT NULL REFERENCES bulk_jobs (id) ON DELETE CASCADE,
+        user_id INTEGER NOT NULL,
+        role_id INTEGER NOT NULL,
+        action TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        detail TEXT,
+        PRIMARY KEY (job_id, user_id, role_id)
+    ) WITHOUT ROWID;
+    """,
+    """
+    ALTER TABLE bulk_job_items ADD COLUMN duration REAL;
+    CREATE TABLE scheduled_role_changes (
+        id INTEGER PRIMARY KEY,
+        due_at REAL NOT NULL,
+        guild_id INTEGER NOT NULL,
+        actor_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        role_id INTEGER NOT NULL,
+        action TEXT NOT NULL,
+        duration REAL,
+        reason TEXT NOT NULL
+    );
+    CREATE INDEX idx_scheduled_due ON scheduled_role_changes (due_at);
+    """,
+    """
+    ALTER TABLE bulk_jobs ADD COLUMN unresolved TEXT;
+    """,
+]
+
+BULK_JOB_COLUMNS = (
+    'id', 'created_at', 'guild_id', 'actor_id', 'reason', 'status',
+    'application_id', 'interaction_token', 'message_id', 'unresolved'
+)
+
+
+def sql_statements(script: str):
+    statement = ""
+    for part in script.split(";"):
+        statement += part + ";"
+        if sqlite3.complete_statement(statement):
+            if statement.strip(" \n;"):
+                yield statement
+            statement = ""
+
+
+class SQLiteBackend(StorageBackend):
+    def __init__(self, path: str = DATABASE_FILE):
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self._conn = None
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for number, script in enumerate(SQLITE_MIGRATIONS[version:], start=version + 1):
+                for statement in sql_statements(script):
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {number}")
+            conn.commit()
+        except:
+            conn.rollback()
+            raise
+        self._conn = conn
+
+    def _close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def open(self):
+        await self._run(self._connect)
+
+    async def close(self):
+        await self._run(self._close)
+        self._executor.shutdown(wait=True)
+
+    def _load_panel_state(self):
+        panels = {}
+        for panel, key, value in self._conn.execute("SELECT panel, key, value FROM panel_state"):
+            panels.setdefault(panel, {})[key] = json.loads(value)
+        return panels
+
+    async def load_panel_state(self) -> dict:
+        return await self._run(self._load_panel_state)
+
+    def _save_panel_values(self, values):
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO panel_state (panel, key, value) VALUES (?, ?, ?) "
+                "ON CONFLICT (panel, key) DO UPDATE SET value = excluded.value",
+                [(panel, key, json.dumps(value)) for panel, key, value in values]
+            )
+
+    async def save_panel_values(self, values):
+        await self._run(self._save_panel_values, list(values))
+
+    def _record_role_changes(self, entries):
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO role_changes "
+                "(created_at, guild_id, actor_id, target_id, role_id, action, success, detail) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                entries
+            )
+
+    async def record_role_changes(self, entries):
+        await self._run(self._record_role_changes, list(entries))
+
+    def _query_role_changes(self, guild_id, target_id, actor_id, role_id, before_id, limit):
+        clauses = ["guild_id = ?"]
+        params = [guild_id]
+        for column, value in (("target_id", target_id), ("actor_id", actor_id), ("role_id", role_id)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if before_id is not None:
+            clauses.append("id < ?")
+            params.append(before_id)
+        params.append(limit)
+        return self._conn.execute(
+            "SELECT id, created_at, actor_id, target_id, role_id, action, success, detail "
+            f"FROM role_changes WHERE {' AND '.join(clauses)} ORDER BY id DESC LIMIT ?",
+            params
+        ).fetchall()
+
+    async def query_role_changes(self, guild_id: int, target_id: Optional[int] = None,
+                                 actor_id: Optional[int] = None, role_id: Optional[int] = None,
+                                 before_id: Optional[int] = None, limit: int = 10) -> list:
+        return await self._run(self._query_role_changes, guild_id, target_id, actor_id, role_id, before_id, limit)
+
+    def _prune_role_changes(self, older_than: float, max_rows: int) -> int:
+        with self._conn:
+            deleted = self._conn.execute(
+                "DELETE FROM role_changes WHERE created_at < ?", (older_than,)
+            ).rowcount
+            deleted += self._conn.execute(
+                "DELETE FROM role_changes WHERE id <= "
+                "(SELECT id FROM role_changes ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                (max_rows,)
+            ).rowcount
+
+        page_count = self._conn.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = self._conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if page_count and free_pages / page_count > 0.25:
+            self._conn.execute("VACUUM")
+        self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return deleted
+
+    async def prune_role_changes(self, older_than: float, max_rows: int) -> int:
+        return await self._run(self._prune_role_changes, older_than, max_rows)
+
+    def _create_job(self, guild_id: int, actor_id: int, reason: str, items, rejected) -> int:
+        with self._conn:
+            job_id = self._conn.execute(
+                "INSERT INTO bulk_jobs (created_at, guild_id, actor_id, reason) VALUES (?, ?, ?, ?)",
+                (time.time(), guild_id, actor_id, reason)
+            ).lastrowid
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO bulk_job_items (job_id, user_id, role_id, action, duration) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(job_id, user_id, role_id, action, duration) for user_id, role_id, action, duration in items]
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO bulk_job_items (job_id, user_id, role_id, action, status, detail) "
+                "VALUES (?, ?, ?, ?, 'failed', ?)",
+                [(job_id, user_id, role_id, action, detail) for user_id, role_id, action, detail in rejected]
+            )
+        return job_id
+
+    async def create_job(self, guild_id: int, actor_id: int, reason: str, items, rejected=()) -> int:
+        return await self._run(self._create_job, guild_id, actor_id, reason, list(items), list(rejected))
+
+    def _update_job(self, job_id: int, fields: dict):
+        assignments = ", ".join(f"{column} = ?" for column in fields if column in BULK_JOB_COLUMNS)
+        with self._conn:
+            self._conn.execute(
+                f"UPDATE bulk_jobs SET {assignments} WHERE id = ?",
+                [value for column, value in fields.items() if column in BULK_JOB_COLUMNS] + [job_id]
+            )
+
+    async def update_job(self, job_id: int, **fields):
+        await self._run(self._update_job, job_id, fields)
+
+    def _load_job(self, job_id: int) -> Optional[dict]:
+        row = self._conn.execute(
+            f"SELECT {', '.join(BULK_JOB_COLUMNS)} FROM bulk_jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        return dict(zip(BULK_JOB_COLUMNS, row)) if row else None
+
+    async def load_job(self, job_id: int) -> Optional[dict]:
+        return await self._run(self._load_job, job_id)
+
+    def _load_unfinished_jobs(self) -> list:
+        rows = self._conn.execute(
+            f"SELECT {', '.join(BULK_JOB_COLUMNS)} FROM bulk_jobs WHERE status != 'done' ORDER BY id"
+        )
+        return [dict(zip(BULK_JOB_COLUMNS, row)) for row in rows]
+
+    async def load_unfinished_jobs(self) -> list:
+        return await self._run(self._load_unfinished_jobs)
+
+    def _load_job_items(self, job_id: int) -> list:
+        return self._conn.execute(
+            "SELECT user_id, role_id, action, status, detail, duration FROM bulk_job_items WHERE job_id = ?",
+            (job_id,)
+        ).fetchall()
+
+    async def load_job_items(self, job_id: int) -> list:
+        return await self._run(self._load_job_items, job_id)
+
+    def _update_job_items(self, job_id: int, updates):
+        with self._conn:
+            self._conn.executemany(
+                "UPDATE bulk_job_items SET status = ?, detail = ? "
+                "WHERE job_id = ? AND user_id = ? AND role_id = ?",
+                [(status, detail, job_id, user_id, role_id) for user_id, role_id, status, detail in updates]
+            )
+
+    async def update_job_items(self, job_id: int, updates):
+        await self._run(self._update_job_items, job_id, list(updates))
+
+    def _prune_jobs(self, older_than: float) -> int:
+        with self._conn:
+            return self._conn.execute(
+                "DELETE FROM bulk_jobs WHERE status = 'done' AND created_at < ?", (older_than,)
+            ).rowcount
+
+    async def prune_jobs(self, older_than: float) -> int:
+        return await self._run(self._prune_jobs, older_than)
+
+    def _schedule_role_changes(self, entries) -> list:
+        with self._conn:
+            return [
+                self._conn.execute(
+                    "INSERT INTO scheduled_role_changes "
+                    "(due_at, guild_id, actor_id, user_id, role_id, action, duration, reason) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    entry
+                ).lastrowid
+                for entry in entries
+            ]
+
+    async def schedule_role_changes(self, entries) -> list:
+        return await self._run(self._schedule_role_changes, list(entries))
+
+    def _load_schedule(self) -> list:
+        return self._conn.execute("SELECT due_at, id FROM scheduled_role_changes").fetchall()
+
+    async def load_schedule(self) -> list:
+        return await self._run(self._load_schedule)
+
+    def _load_scheduled(self, ids) -> list:
+        rows = []
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            rows += self._conn.execute(
+                "SELECT id, guild_id, actor_id, user_id, role_id, action, duration, reason "
+                f"FROM scheduled_role_changes WHERE id IN ({', '.join('?' * len(chunk))})",
+                chunk
+            ).fetchall()
+        return rows
+
+    async def load_scheduled(self, ids) -> list:
+        return await self._run(self._load_scheduled, list(ids))
+
+    def _delete_scheduled(self, ids):
+        with self._conn:
+            self._conn.executemany("DELETE FROM scheduled_role_changes WHERE id = ?", [(i,) for i in ids])
+
+    async def delete_scheduled(self, ids):
+        await self._run(self._delete_scheduled, list(ids))
+
+
+class SharedState(ABC):
+    owners = itertools.count()
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    @abstractmethod
+    async def get(self, key: str):
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value, ttl: Optional[float] = None):
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str):
+        ...
+
+    @abstractmethod
+    async def claim(self, key: str, owner: str, ttl: float) -> bool:
+        ...
+
+    @abstractmethod
+    async def release(self, key: str, owner: str):
+        ...
+
+    @contextlib.asynccontextmanager
+    async def lock(self, key: str, ttl: float = MEMBER_LOCK_TTL, poll: float = 0.05):
+        owner = f"{PROCESS_ID}:{next(self.owners)}"
+        while not await self.claim(key, owner, ttl):
+            await asyncio.sleep(poll)
+        try:
+            yield
+        finally:
+            await self.release(key, owner)
+
+
+class MemoryState(SharedState):
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.values = {}
+        self.deadlines = []
+
+    def _expire(self):
+        now = self.clock()
+        while self.deadlines and self.deadlines[0][0] <= now:
+            deadline, key = heapq.heappop(self.deadlines)
+            entry = self.values.get(key)
+            if entry is not None and entry[1] == deadline:
+                del self.values[key]
+
+    def _store(self, key: str, value, ttl: Optional[float]):
+        self._expire()
+        deadline = self.clock() + ttl if ttl else None
+        self.values[key] = (value, deadline)
+        if deadline is not None:
+            heapq.heappush(self.deadlines, (deadline, key))
+
+    def _entry(self, key: str):
+        entry = self.values.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= self.clock():
+            del self.values[key]
+            return None
+        return entry
+
+    async def get(self, key: str):
+        entry = self._entry(key)
+        return entry[0] if entry else None
+
+    async def set(self, key: str, value, ttl: Optional[float] = None):
+        self._store(key, value, ttl)
+
+    async def delete(self, key: str):
+        self.values.pop(key, None)
+
+    async def claim(self, key: str, owner: str, ttl: float) -> bool:
+        entry = self._entry(key)
+        if entry is not None and entry[0] != owner:
+            return False
+        self._store(key, owner, ttl)
+        return True
+
+    async def release(self, key: str, owner: str):
+        entry = self._entry(key)
+        if entry is not None and entry[0] == owner:
+            del self.values[key]
+
+
+class RedisState(SharedState):
+    CLAIM_SCRIPT = """
+        local current = redis.call('GET', KEYS[1])
+        if current and current ~= ARGV[1] then
+            return 0
+        end
+        redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+        return 1
+    """
+    RELEASE_SCRIPT = """
+        if redis.call('GET', KEYS[1]) == ARGV[1] then
+            return redis.call('DEL', KEYS[1])
+        end
+        return 0
+    """
+
+    def __init__(self, url: Optional[str] = None, prefix: str = SHARED_STATE_PREFIX, client=None):
+        self.url = url
+        self.prefix = prefix
+        self.client = client
+
+    async def open(self):
+        if self.client is None:
+            if redis_asyncio is None:
+                raise RuntimeError(f"SHARED_STATE_URL={self.url} needs the redis package (pip install redis)")
+            self.client = redis_asyncio.from_url(self.url)
+        await self.client.ping()
+        print(f"✅ Connected to shared state at {self.url or 'custom client'}")
+
+    async def close(self):
+        if self.client is not None:
+            close = getattr(self.client, 'aclose', None) or self.client.close
+            await close()
+
+    async def get(self, key: str):
+        value = await self.client.get(self.prefix + key)
+        return json.loads(value) if value is not None else None
+
+    async def set(self, key: str, value, ttl: Optional[float] = None):
+        await self.client.set(self.prefix + key, json.dumps(value), px=int(ttl * 1000) if ttl else None)
+
+    async def delete(self, key: str):
+        await self.client.delete(self.prefix + key)
+
+    async def claim(self, key: str, owner: str, ttl: float) -> bool:
+        return bool(await self.client.eval(self.CLAIM_SCRIPT, 1, self.prefix + key, json.dumps(owner), int(ttl * 1000)))
+
+    async def release(self, key: str, owner: str):
+        await self.client.eval(self.RELEASE_SCRIPT, 1, self.prefix + key, json.dumps(owner))
+
+
+def open_shared_state(url: str = SHARED_STATE_URL) -> SharedState:
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisState(url)
+    return MemoryState()
+
+
+def role_set_version(title: str, roles: dict) -> str:
+    return hashlib.sha256(json.dumps([title, list(roles.items())]).encode()).hexdigest()[:12]
+
+
+class PanelConfig:
+    def __init__(self, guild_id: int, name: str, channel_id: int, roles: dict, title: str = "Role Management Panel"):
+        self.guild_id = guild_id
+        self.name = name
+        self.channel_id = channel_id
+        self.roles = dict(roles)
+        self.title = title
+        self.configured_version = self.version = role_set_version(title, self.roles)
+        self.rendered = {}
+
+    def set_roles(self, roles: dict):
+        self.roles = dict(roles)
+        self.version = role_set_version(self.title, self.roles)
+        self.rendered.clear()
+
+    def cached(self, key, render):
+        key = (key, self.version)
+        if key not in self.rendered:
+            self.rendered[key] = render()
+        return self.rendered[key]
+
+    def select_options(self, action: str) -> list:
+        label, emoji = ("Give", "✅") if action == "give" else ("Remove", "🗑️")
+        return self.cached(('options', action), lambda: [
+            discord.SelectOption(
+                label=name,
+                value=f"{action}_{role_id}",
+                description=f"{label} {name} role"[:SELECT_TEXT_LIMIT],
+                emoji=emoji
+            )
+            for name, role_id in self.roles.items()
+        ])
+
+    @property
+    def key(self) -> str:
+        return f"{self.guild_id}:{self.name}"
+
+    @property
+    def custom_id(self) -> str:
+        return f"rp:{self.guild_id}:{self.name}"
+
+
+class GuildConfig:
+    def __init__(self, guild_id: int, helper_role_ids, log_channel_id: int, panels, delegations=None):
+        self.guild_id = guild_id
+        self.helper_role_ids = set(helper_role_ids)
+        self.log_channel_id = log_channel_id
+        self.panels = {panel.name: panel for panel in panels}
+        self.delegation_names = {int(lead): list(roles) for lead, roles in (delegations or {}).items()}
+        self.refresh_roles()
+
+    def refresh_roles(self):
+        self.roles = {}
+        for panel in self.panels.values():
+            for name, role_id in panel.roles.items():
+                self.roles.setdefault(name, role_id)
+        self.role_ids = set(self.roles.values())
+        self.role_names = {role_id: name for name, role_id in self.roles.items()}
+        self.delegations = {
+            lead: frozenset(filter(None, map(self.resolve_role, roles)))
+            for lead, roles in self.delegation_names.items()
+        }
+
+    def resolve_role(self, role) -> Optional[int]:
+        role = str(role)
+        return int(role) if role.isdigit() else self.roles.get(role.upper())
+
+    def panel(self, name: Optional[str] = None) -> Optional[PanelConfig]:
+        if name is None:
+            return self.panels.get(DEFAULT_PANEL) or next(iter(self.panels.values()), None)
+        return self.panels.get(name)
+
+
+class GuildConfigRegistry:
+    def __init__(self, guilds=()):
+        self.guilds = {guild.guild_id: guild for guild in guilds}
+
+    def __iter__(self):
+        return iter(self.guilds.values())
+
+    def get(self, guild_id: Optional[int]) -> Optional[GuildConfig]:
+        return self.guilds.get(guild_id)
+
+    def roles(self, guild_id: Optional[int]) -> dict:
+        config = self.guilds.get(guild_id)
+        return config.roles if config else {}
+
+    def panels(self):
+        for config in self.guilds.values():
+            yield from config.panels.values()
+
+    @classmethod
+    def load(cls, path: str = GUILD_CONFIG_FILE) -> "GuildConfigRegistry":
+        if not os.path.exists(path):
+            return cls.from_env()
+
+        with open(path, 'r') as f:
+            data = json.load(f)
+
+        guilds = []
+        for guild_id, values in data.get('guilds', {}).items():
+            guild_id = int(guild_id)
+            panels = [
+                PanelConfig(
+                    guild_id,
+                    name,
+                    int(panel['channel_id']),
+                    {role_name: int(role_id) for role_name, role_id in panel['roles'].items()},
+                    panel.get('title', "Role Management Panel")
+                )
+                for name, panel in values.get('panels', {}).items()
+            ]
+            helper_role_ids = values.get('helper_role_ids', [values.get('helper_role_id', 0)])
+            guilds.append(GuildConfig(
+                guild_id,
+                [int(role_id) for role_id in helper_role_ids if int(role_id)],
+                int(values.get('log_channel_id', 0)),
+                panels,
+                values.get('delegations')
+            ))
+        print(f"ℹ️ Loaded configuration for {len(guilds)} guild(s) from {path}")
+        return cls(guilds)
+
+    @classmethod
+    def from_env(cls) -> "GuildConfigRegistry":
+        guild_id = int(os.getenv('GUILD_ID'))
+        panel = PanelConfig(
+            guild_id,
+            DEFAULT_PANEL,
+            int(os.getenv('PANEL_CHANNEL_ID')),
+            {name: int(os.getenv(name)) for name in LEGACY_ROLE_NAMES}
+        )
+        helper_role_ids = [int(role_id) for role_id in os.getenv('HELPER_ROLE_ID').split(',') if role_id.strip()]
+        return cls([GuildConfig(guild_id, helper_role_ids, int(os.getenv('LOG_CHANNEL_ID')), [panel])])
 
 
 class PanelDataManager:
-    
-    @staticmethod
-    def load():
+    def __init__(self, storage: StorageBackend, shared: SharedState, flush_delay: float = PANEL_FLUSH_DELAY):
+        self.storage = storage
+        self.shared = shared
+        self.flush_delay = flush_delay
+        self.data = {'panels': {}}
+        self._dirty = set()
+        self._flush_task = None
+
+    async def load(self):
+        self.data['panels'] = await self.storage.load_panel_state()
+        self.migrate_legacy_panel()
+        if self.data['panels'] or not os.path.exists(PANEL_DATA_FILE):
+            return
+
         try:
-            if os.path.exists(PANEL_DATA_FILE):
-                with open(PANEL_DATA_FILE, 'r') as f:
-                    return json.load(f)
+            with open(PANEL_DATA_FILE, 'r') as f:
+                legacy = json.load(f)
         except Exception as e:
             print(f"⚠️ Failed to load panel data: {e}")
-        return {}
-    
-    @staticmethod
-    def save(data):
+            return
+
+        if 'panel_message_id' in legacy:
+            self.set('message_id', legacy['panel_message_id'], DEFAULT_PANEL)
+        for panel, values in legacy.get('panels', {}).items():
+            for key, value in values.items():
+                self.set(key, value, panel)
+        self.migrate_legacy_panel()
+        print(f"ℹ️ Imported panel data from {PANEL_DATA_FILE}")
+
+    def migrate_legacy_panel(self):
+        legacy = self.data['panels'].get(DEFAULT_PANEL)
+        if not legacy or not os.getenv('GUILD_ID'):
+            return
+        panel = f"{os.getenv('GUILD_ID')}:{DEFAULT_PANEL}"
+        for key, value in list(legacy.items()):
+            if self.get(key, panel) is None:
+                self.set(key, value, panel)
+            self.set(key, None, DEFAULT_PANEL)
+
+    def get(self, key: str, panel: str, default=None):
+        return self.data['panels'].get(panel, {}).get(key, default)
+
+    def set(self, key: str, value, panel: str):
+        panel_data = self.data['panels'].setdefault(panel, {})
+        if key in panel_data and panel_data[key] == value:
+            return
+        panel_data[key] = value
+        self._dirty.add((panel, key))
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = spawn(self._flush_later())
+
+    async def get_message_id(self, panel: PanelConfig) -> Optional[int]:
+        message_id = await self.shared.get(f"panel:{panel.key}:message_id")
+        if message_id is None:
+            return self.get('message_id', panel.key)
+        return message_id or None
+
+    async def set_message_id(self, panel: PanelConfig, message_id: Optional[int]):
+        self.set('message_id', message_id, panel.key)
+        await self.shared.set(f"panel:{panel.key}:message_id", message_id or 0)
+
+    async def _flush_later(self):
+        while self._dirty:
+            await asyncio.sleep(self.flush_delay)
+            await self.flush()
+
+    @timed("background")
+    async def flush(self):
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, set()
+        values = [(panel, key, self.data['panels'][panel][key]) for panel, key in dirty]
         try:
-            with open(PANEL_DATA_FILE, 'w') as f:
-                json.dump(data, f, indent=2)
+            await self.storage.save_panel_values(values)
         except Exception as e:
             print(f"⚠️ Failed to save panel data: {e}")
+            self._dirty |= dirty
+
+
+class RoleMembershipIndex:
+    def __init__(self, guild_roles: dict):
+        self.guild_roles = {guild_id: list(role_ids) for guild_id, role_ids in guild_roles.items()}
+        self.members = {role_id: set() for role_ids in self.guild_roles.values() for role_id in role_ids}
+        self.listeners = []
+
+    def _changed(self, role_id: int):
+        for listener in self.listeners:
+            listener(role_id)
+
+    def build(self, guild: discord.Guild):
+        role_ids = self.guild_roles.get(guild.id, [])
+        members = {role_id: set() for role_id in role_ids}
+        for member in guild.members:
+            for role_id in role_ids:
+                if member.get_role(role_id) is not None:
+                    members[role_id].add(member.id)
+        self.members.update(members)
+        for role_id in role_ids:
+            self._changed(role_id)
+
+    def set_roles(self, guild: discord.Guild, role_ids):
+        for role_id in set(self.guild_roles.get(guild.id, ())) - set(role_ids):
+            self.members.pop(role_id, None)
+            self._changed(role_id)
+        self.guild_roles[guild.id] = list(role_ids)
+        self.build(guild)
+
+    def count(self, role_id: int) -> int:
+        return len(self.members.get(role_id, ()))
+
+    def sample(self, role_id: int, limit: int):
+        return itertools.islice(self.members.get(role_id, ()), limit)
+
+    def add(self, role_id: int, member_id: int):
+        members = self.members.get(role_id)
+        if members is not None and member_id not in members:
+            members.add(member_id)
+            self._changed(role_id)
+
+    def discard(self, role_id: int, member_id: int):
+        members = self.members.get(role_id)
+        if members is not None and member_id in members:
+            members.discard(member_id)
+            self._changed(role_id)
+
+    def apply(self, action: str, role_id: int, member_id: int):
+        if action == "give":
+            self.add(role_id, member_id)
+        else:
+            self.discard(role_id, member_id)
+
+    def update_member(self, member: discord.Member):
+        for role_id in self.guild_roles.get(member.guild.id, ()):
+            if member.get_role(role_id) is not None:
+                self.add(role_id, member.id)
+            else:
+                self.discard(role_id, member.id)
+
+    def remove_member(self, member: discord.Member):
+        for role_id in self.guild_roles.get(member.guild.id, ()):
+            self.discard(role_id, member.id)
+
+    def verify(self, guild: discord.Guild) -> dict:
+        mismatches = {}
+        for role_id in self.guild_roles.get(guild.id, ()):
+            role = guild.get_role(role_id)
+            expected = {member.id for member in role.members} if role else set()
+            actual = self.members.get(role_id, set())
+            if expected != actual:
+                mismatches[role_id] = (expected - actual, actual - expected)
+        return mismatches
+
+
+class AuthorizationIndex:
+    def __init__(self, registry: GuildConfigRegistry):
+        self.registry = registry
+        self.admins = {}
+        self.helpers = {}
+        self.delegates = {}
+        self.admin_roles = {}
+        self.lookups = 0
+        self.fallbacks = 0
+
+    def grants(self, member: discord.Member):
+        config = self.registry.get(member.guild.id)
+        if config is None:
+            return False, False, frozenset()
+        is_admin = member.guild_permissions.administrator
+        role_ids = {role.id for role in member.roles}
+        is_helper = not config.helper_role_ids.isdisjoint(role_ids)
+        delegated = frozenset().union(*(
+            roles for lead, roles in config.delegations.items() if lead in role_ids
+        ))
+        return is_admin, is_helper, delegated
+
+    def build(self, guild: discord.Guild):
+        self.admin_roles[guild.id] = {role.id for role in guild.roles if role.permissions.administrator}
+        self.admins[guild.id] = set()
+        self.helpers[guild.id] = set()
+        self.delegates[guild.id] = {}
+        for member in guild.members:
+            self.update_member(member)
+
+    def update_member(self, member: discord.Member):
+        guild_id = member.guild.id
+        if guild_id not in self.admins:
+            return
+        is_admin, is_helper, delegated = self.grants(member)
+        for members, granted in ((self.admins[guild_id], is_admin), (self.helpers[guild_id], is_helper)):
+            if granted:
+                members.add(member.id)
+            else:
+                members.discard(member.id)
+        if delegated:
+            self.delegates[guild_id][member.id] = delegated
+        else:
+            self.delegates[guild_id].pop(member.id, None)
+
+    def remove_member(self, member: discord.Member):
+        guild_id = member.guild.id
+        if guild_id in self.admins:
+            self.admins[guild_id].discard(member.id)
+            self.helpers[guild_id].discard(member.id)
+            self.delegates[guild_id].pop(member.id, None)
+
+    def role_changed(self, before: discord.Role, after: discord.Role):
+        guild = after.guild
+        config = self.registry.get(guild.id)
+        if config is None or guild.id not in self.admins:
+            return
+        relevant = (after.id in config.helper_role_ids or after.id in config.delegations
+                    or after.id in self.admin_roles[guild.id])
+        if before.permissions.administrator != after.permissions.administrator or relevant:
+            self.build(guild)
+
+    def allowed(self, member: discord.abc.User, guild_id: int, role_id: Optional[int] = None) -> bool:
+        self.lookups += 1
+        if guild_id not in self.admins or not isinstance(member, discord.Member):
+            self.fallbacks += 1
+            if not isinstance(member, discord.Member):
+                return False
+            is_admin, is_helper, delegated = self.grants(member)
+        else:
+            is_admin = member.id in self.admins[guild_id] or member.id == member.guild.owner_id
+            is_helper = member.id in self.helpers[guild_id]
+            delegated = self.delegates[guild_id].get(member.id, frozenset())
+        if is_admin or is_helper:
+            return True
+        return bool(delegated) if role_id is None else role_id in delegated
+
+
+class EmbedCache:
+    def __init__(self, ttl: float = EMBED_CACHE_TTL):
+        self.ttl = ttl
+        self.entries = {}
+        self.keys_by_role = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get_or_render(self, key, role_ids, render) -> discord.Embed:
+        entry = self.entries.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            self.hits += 1
+            return entry[0].copy()
+
+        self.misses += 1
+        embed = render()
+        self.entries[key] = (embed, time.monotonic() + self.ttl)
+        for role_id in role_ids:
+            self.keys_by_role.setdefault(role_id, set()).add(key)
+        return embed.copy()
+
+    def invalidate_role(self, role_id: int):
+        for key in self.keys_by_role.pop(role_id, ()):
+            self.invalidate(key)
+
+    def invalidate(self, key):
+        if self.entries.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self):
+        self.invalidations += len(self.entries)
+        self.entries.clear()
+        self.keys_by_role.clear()
+
+
+class MemberBrowserIndex:
+    def __init__(self, index: RoleMembershipIndex, page_size: int = BROWSER_PAGE_SIZE,
+                 pages_per_viewer: int = BROWSER_PAGES_PER_VIEWER, max_viewers: int = BROWSER_MAX_VIEWERS):
+        self.index = index
+        self.page_size = page_size
+        self.pages_per_viewer = pages_per_viewer
+        self.max_viewers = max_viewers
+        self.sorted = {}
+        self.versions = {}
+        self.viewers = OrderedDict()
+
+    def invalidate_role(self, role_id: int):
+        self.sorted.pop(role_id, None)
+        self.versions[role_id] = self.versions.get(role_id, 0) + 1
+
+    def invalidate_member(self, member: discord.Member):
+        for role_id in self.index.guild_roles.get(member.guild.id, ()):
+            if member.id in self.index.members.get(role_id, ()):
+                self.invalidate_role(role_id)
+
+    def _sorted(self, guild: discord.Guild, role_id: int):
+        entry = self.sorted.get(role_id)
+        if entry is None:
+            pairs = []
+            for member_id in self.index.members.get(role_id, ()):
+                member = guild.get_member(member_id)
+                name = member.display_name if member else str(member_id)
+                pairs.append((name.casefold(), member_id))
+            pairs.sort()
+            entry = self.sorted[role_id] = ([name for name, _ in pairs], [member_id for _, member_id in pairs])
+        return entry
+
+    def span(self, guild: discord.Guild, role_id: int, prefix: str = ""):
+        names, member_ids = self._sorted(guild, role_id)
+        if not prefix:
+            return member_ids, 0, len(member_ids)
+        prefix = prefix.casefold()
+        start = bisect.bisect_left(names, prefix)
+        end = bisect.bisect_left(names, prefix + "\U0010ffff", start)
+        return member_ids, start, end
+
+    def page_count(self, guild: discord.Guild, role_id: int, prefix: str = "") -> int:
+        _, start, end = self.span(guild, role_id, prefix)
+        return max(1, -(-(end - start) // self.page_size))
+
+    def _viewer_pages(self, viewer_id: int) -> OrderedDict:
+        pages = self.viewers.get(viewer_id)
+        if pages is None:
+            pages = self.viewers[viewer_id] = OrderedDict()
+            if len(self.viewers) > self.max_viewers:
+                self.viewers.popitem(last=False)
+        else:
+            self.viewers.move_to_end(viewer_id)
+        return pages
+
+    def render(self, guild: discord.Guild, viewer_id: int, role_id: int, page: int, prefix: str = "") -> discord.Embed:
+        pages = self._viewer_pages(viewer_id)
+        key = (role_id, self.versions.get(role_id, 0), prefix, page)
+        embed = pages.get(key)
+        if embed is not None:
+            pages.move_to_end(key)
+            return embed.copy()
+
+        member_ids, start, end = self.span(guild, role_id, prefix)
+        total = end - start
+        page_count = max(1, -(-total // self.page_size))
+        first = start + page * self.page_size
+        rows = [
+            f"`{first - start + offset + 1}.` <@{member_id}>"
+            for offset, member_id in enumerate(member_ids[first:min(first + self.page_size, end)])
+        ]
+
+        role = guild.get_role(role_id)
+        embed = discord.Embed(
+            title=f"👥 {role.name if role else role_id} Members",
+            description="\n".join(rows) or "*No members match*",
+            color=discord.Color.teal()
+        )
+        footer = f"Page {page + 1}/{page_count} • {total} members"
+        if prefix:
+            footer += f" • Filter: {prefix}"
+        embed.set_footer(text=footer)
+
+        pages[key] = embed
+        if len(pages) > self.pages_per_viewer:
+            pages.popitem(last=False)
+        return embed.copy()
+
+
+class AuditLog:
+    def __init__(self, storage: StorageBackend, retention: timedelta = AUDIT_RETENTION,
+                 max_rows: int = AUDIT_MAX_ROWS):
+        self.storage = storage
+        self.retention = retention
+        self.max_rows = max_rows
+        self._task_started = False
+
+    def start_compaction(self):
+        if not self._task_started:
+            self.compaction_task.start()
+            self._task_started = True
+
+    def record(self, entries):
+        if entries:
+            spawn(self.storage.record_role_changes(entries))
+
+    async def history(self, guild_id: int, target_id: Optional[int] = None, actor_id: Optional[int] = None,
+                      role_id: Optional[int] = None, before_id: Optional[int] = None, limit: int = 10) -> list:
+        return await self.storage.query_role_changes(guild_id, target_id, actor_id, role_id, before_id, limit)
+
+    @tasks.loop(hours=24)
+    @timed("background")
+    async def compaction_task(self):
+        if not await shared_state.claim("audit:compaction", PROCESS_ID, 3600):
+            return
+        cutoff = time.time() - self.retention.total_seconds()
+        deleted = await self.storage.prune_role_changes(cutoff, self.max_rows)
+        if deleted:
+            print(f"🧹 Pruned {deleted} audit log entries")
+
+
+class PlanPreviewView(discord.ui.View):
+    def __init__(self, user_id: int):
+        super().__init__(timeout=60)
+        self.user_id = user_id
+        self.value = None
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user.id == self.user_id
     
-    @staticmethod
-    def get_message_id():
-        data = PanelDataManager.load()
-        return data.get('panel_message_id')
+    @discord.ui.button(label="✅ Apply", style=discord.ButtonStyle.success)
+    @timed("component")
+    async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.value = True
+        self.stop()
+        await interaction.response.defer()
     
+    @discord.ui.button(label="❌ Cancel", style=discord.ButtonStyle.danger)
+    @timed("component")
+    async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.value = False
+        self.stop()
+        await interaction.response.defer()
+
+
+class RouteBucket:
+    def __init__(self, limit: int):
+        self.semaphore = asyncio.Semaphore(limit)
+        self.blocked_until = 0.0
+
+    async def wait(self):
+        delay = self.blocked_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def block(self, retry_after: float):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+
+class MemberResolver:
+    def __init__(self):
+        self.cache_hits = 0
+        self.payload_hits = 0
+        self.gateway_hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.cache_hits + self.payload_hits + self.gateway_hits + self.misses
+        return (self.cache_hits + self.payload_hits) / total if total else 0.0
+
+    async def resolve(self, guild: discord.Guild, user_ids, resolved=()) -> dict:
+        payload_members = {
+            member.id: member for member in resolved
+            if isinstance(member, discord.Member)
+        }
+        members = {}
+        pending = []
+
+        for user_id in map(int, user_ids):
+            member = guild.get_member(user_id)
+            if member is not None:
+                self.cache_hits += 1
+            else:
+                member = payload_members.get(user_id)
+                if member is None:
+                    pending.append(user_id)
+                    continue
+                self.payload_hits += 1
+            members[user_id] = member
+
+        for start in range(0, len(pending), 100):
+            chunk = pending[start:start + 100]
+            try:
+                found = await guild.query_members(user_ids=chunk, limit=len(chunk), cache=True)
+            except (asyncio.TimeoutError, discord.ClientException) as e:
+                print(f"⚠️ Member chunk request failed: {e}")
+                continue
+            for member in found:
+                members[member.id] = member
+            self.gateway_hits += len(found)
+
+        self.misses += len(pending) - sum(1 for user_id in pending if user_id in members)
+        return members
+
+
+def role_change_problem(guild: discord.Guild, member: discord.Member, role: discord.Role, action: str) -> Optional[str]:
+    if member.bot:
+        return "cannot manage bots"
+    if member.top_role >= guild.me.top_role:
+        return "higher role than bot"
+    has_role = role_gate.has_role(member, role.id)
+    if action == "give" and has_role:
+        return "already has role"
+    if action == "remove" and not has_role:
+        return "no role to remove"
+    return None
+
+
+class RoleOperationGate:
+    def __init__(self):
+        self.inflight = {}
+        self.locks = {}
+        self.known = {}
+        self.deduplicated = 0
+        self.contended = 0
+
+    def has_role(self, member: discord.Member, role_id: int) -> bool:
+        known = self.known.get((member.guild.id, member.id), {}).get(role_id)
+        if known is not None and known[1] > time.monotonic():
+            return known[0]
+        return member.get_role(role_id) is not None
+
+    def remember(self, member: discord.Member, role_id: int, has_role: bool):
+        self.known.setdefault((member.guild.id, member.id), {})[role_id] = (has_role, time.monotonic() + ROLE_STATE_TTL)
+
+    def forget(self, member: discord.Member):
+        self.known.pop((member.guild.id, member.id), None)
+
+    def reset(self, guild_id: int):
+        self.known = {key: roles for key, roles in self.known.items() if key[0] != guild_id}
+
+    async def run(self, guild_id: int, member_id: int, role_id: int, action: str, operation):
+        key = (guild_id, member_id, role_id)
+        future = self.inflight.get((key, action))
+        if future is not None:
+            self.deduplicated += 1
+            metrics.inc("rolebot_role_ops_deduplicated_total", action=action)
+            return await asyncio.shield(future)
+
+        future = self.inflight[(key, action)] = asyncio.get_running_loop().create_future()
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        entry = self.locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            if entry[0].locked():
+                self.contended += 1
+                metrics.inc("rolebot_role_lock_contended_total", action=action)
+            started = time.perf_counter()
+            async with entry[0]:
+                metrics.observe("rolebot_role_lock_wait_seconds", time.perf_counter() - started)
+                result = await operation()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            del self.inflight[(key, action)]
+            entry[1] -= 1
+            if not entry[1]:
+                del self.locks[key]
+
+
+def plan_role_changes(guild: discord.Guild, items, members: dict):
+    top_role = guild.me.top_role
+    groups = {}
+    for user_id, role_id, action, duration in items:
+        groups.setdefault((role_id, action), []).append((user_id, duration))
+
+    approved = []
+    rejected = []
+    for (role_id, action), group in groups.items():
+        role = guild.get_role(role_id)
+        if role is None or role >= top_role:
+            problem = "role not found" if role is None else "role higher than bot"
+            rejected.extend((user_id, role_id, action, f"<@{user_id}> ({problem})") for user_id, _ in group)
+            continue
+
+        for user_id, duration in group:
+            member = members.get(user_id)
+            if member is None:
+                problem = "member not found"
+            elif member.bot:
+                problem = "cannot manage bots"
+            elif member.top_role >= top_role:
+                problem = "higher role than bot"
+            elif role_gate.has_role(member, role_id) == (action == "give"):
+                problem = "already has role" if action == "give" else "no role to remove"
+            else:
+                approved.append((user_id, role_id, action, duration))
+                continue
+            rejected.append((user_id, role_id, action, f"<@{user_id}> ({problem})"))
+    return approved, rejected
+
+
+def render_plan_preview(role: discord.Role, action: str, approved, rejected, hours: int = 0) -> discord.Embed:
+    duration_text = f" for {format_hours(hours)}" if hours else ""
+    embed = discord.Embed(
+        title=f"📝 Preview: {action} {role.name}{duration_text}",
+        description=f"**{len(approved)}** change(s) will be applied, **{len(rejected)}** member(s) will be skipped.",
+        color=discord.Color.green() if action == "give" else discord.Color.orange()
+    )
+    sections = [(f"{'➕' if action == 'give' else '➖'} Will change", [f"<@{item[0]}>" for item in approved])]
+    if rejected:
+        sections.append(("⏭️ Skipped", [detail for _, _, _, detail in rejected]))
+    for name, lines in sections:
+        values = pack_field_values(lines, EMBED_FIELD_LIMIT - 16)
+        embed.add_field(
+            name=f"{name} ({len(lines)})",
+            value=values[0] + ("\n*...and more*" if len(values) > 1 else ""),
+            inline=False
+        )
+    return embed
+
+
+class BulkRoleExecutor:
+    def __init__(self, concurrency: int = BULK_CONCURRENCY, bucket_concurrency: int = BULK_BUCKET_CONCURRENCY,
+                 max_retries: int = BULK_MAX_RETRIES):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.bucket_concurrency = bucket_concurrency
+        self.max_retries = max_retries
+        self.buckets = {}
+        self.retries = 0
+
+    def bucket(self, key: str) -> RouteBucket:
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = RouteBucket(self.bucket_concurrency)
+        return bucket
+
     @staticmethod
-    def set_message_id(message_id: int):
-        data = PanelDataManager.load()
-        data['panel_message_id'] = message_id
-        PanelDataManager.save(data)
+    def retry_after(error: Exception) -> Optional[float]:
+        if isinstance(error, discord.RateLimited):
+            return error.retry_after
+        if isinstance(error, discord.HTTPException) and error.status == 429:
+            headers = getattr(error.response, 'headers', None) or {}
+            try:
+                return float(headers.get('Retry-After', 1))
+            except ValueError:
+                return 1.0
+        return None
+
+    async def request(self, key: str, func, *args, **kwargs):
+        bucket = self.bucket(key)
+        attempt = 0
+        while True:
+            async with bucket.semaphore:
+                await bucket.wait()
+                try:
+                    return await func(*args, **kwargs)
+                except (discord.HTTPException, discord.RateLimited) as e:
+                    retry_after = self.retry_after(e)
+                    if retry_after is None or attempt >= self.max_retries:
+                        raise
+                    bucket.block(retry_after)
+            attempt += 1
+            self.retries += 1
+
+    async def apply(self, guild: discord.Guild, role: discord.Role, action: str, user_id, reason: str,
+                    member: Optional[discord.Member] = None):
+        try:
+            if member is None:
+                async with self.semaphore:
+                    member = await self.request(
+                        f"GET /guilds/{guild.id}/members", guild.fetch_member, int(user_id)
+                    )
+
+            return await role_gate.run(
+                guild.id, member.id, role.id, action,
+                lambda: self.change(guild, role, action, member, reason)
+            )
+
+        except discord.Forbidden:
+            return False, f"<@{user_id}> (permission denied)"
+        except (discord.HTTPException, discord.RateLimited):
+            return False, f"<@{user_id}> (network error)"
+        except Exception as e:
+            return False, f"<@{user_id}> (error: {type(e).__name__})"
+
+    async def change(self, guild: discord.Guild, role: discord.Role, action: str, member: discord.Member, reason: str):
+        async with self.semaphore, shared_state.lock(f"member:{guild.id}:{member.id}:{role.id}"):
+            problem = role_change_problem(guild, member, role, action)
+            if problem:
+                return False, f"{member.mention} ({problem})"
+
+            route = f"/guilds/{guild.id}/members/roles"
+            if action == "give":
+                await self.request(f"PUT {route}", member.add_roles, role, reason=reason)
+            else:
+                await self.request(f"DELETE {route}", member.remove_roles, role, reason=reason)
+            role_gate.remember(member, role.id, action == "give")
+
+        return True, member.mention
+
+    async def run(self, guild: discord.Guild, role: discord.Role, action: str, user_ids, reason: str,
+                  members: Optional[dict] = None, on_result=None):
+        members = members or {}
+
+        async def bounded(user_id):
+            ok, text = await self.apply(guild, role, action, user_id, reason, members.get(int(user_id)))
+            if on_result is not None:
+                on_result(int(user_id), ok, text)
+            return ok, text
+
+        results = await asyncio.gather(*(bounded(user_id) for user_id in user_ids))
+
+        success_list = [text for ok, text in results if ok]
+        failed_list = [text for ok, text in results if not ok]
+        return success_list, failed_list
+
+
+def has_panel_permission(interaction: discord.Interaction, role_id: Optional[int] = None) -> bool:
+    return authorization.allowed(interaction.user, interaction.guild_id, role_id)
+
+
+class BulkJobQueue:
+    def __init__(self, storage: StorageBackend, executor: BulkRoleExecutor, resolver: MemberResolver,
+                 workers: int = BULK_JOB_WORKERS, chunk_size: int = BULK_JOB_CHUNK_SIZE):
+        self.storage = storage
+        self.executor = executor
+        self.resolver = resolver
+        self.worker_count = workers
+        self.chunk_size = chunk_size
+        self.queue = asyncio.Queue()
+        self.active = set()
+        self.resolved = {}
+        self.workers = []
+
+    def start(self):
+        if not self.workers:
+            self.workers = [spawn(self._worker()) for _ in range(self.worker_count)]
+
+    def stop(self):
+        for worker in self.workers:
+            worker.cancel()
+        self.workers = []
+
+    def enqueue(self, job_id: int):
+        if job_id not in self.active:
+            self.active.add(job_id)
+            self.queue.put_nowait(job_id)
+
+    async def submit(self, guild_id: int, actor_id: int, reason: str, items,
+                     interaction: Optional[discord.Interaction] = None, resolved=(),
+                     rejected=(), unresolved=None) -> int:
+        items = list(items)
+        rejected = list(rejected)
+        job_id = await self.storage.create_job(guild_id, actor_id, reason, items, rejected)
+        if unresolved is not None:
+            await self.storage.update_job(job_id, unresolved=json.dumps(unresolved))
+        if resolved:
+            self.resolved[job_id] = list(resolved)
+        if interaction is not None:
+            message = await interaction.followup.send(
+                f"⏳ Bulk job **#{job_id}** queued ({len(items) + len(rejected)} changes)",
+                ephemeral=True,
+                wait=True
+            )
+            await self.storage.update_job(
+                job_id,
+                application_id=interaction.application_id,
+                interaction_token=interaction.token,
+                message_id=message.id
+            )
+        self.enqueue(job_id)
+        return job_id
+
+    @timed("startup")
+    async def resume(self):
+        await self.storage.prune_jobs(time.time() - BULK_JOB_RETENTION.total_seconds())
+        jobs = await self.storage.load_unfinished_jobs()
+        for job in jobs:
+            self.enqueue(job['id'])
+        if jobs:
+            print(f"ℹ️ Resuming {len(jobs)} unfinished bulk job(s)")
+
+    async def _worker(self):
+        while True:
+            job_id = await self.queue.get()
+            try:
+                await self.run_job(job_id)
+            except Exception as e:
+                print(f"❌ Bulk job #{job_id} failed: {e}")
+            finally:
+                self.active.discard(job_id)
+                self.resolved.pop(job_id, None)
+
+    async def edit_message(self, job: dict, **kwargs):
+        if not job['interaction_token'] or not job['message_id']:
+            return
+        webhook = discord.Webhook.partial(job['application_id'], job['interaction_token'], client=bot)
+        try:
+            await webhook.edit_message(job['message_id'], **kwargs)
+        except discord.HTTPException:
+            job['interaction_token'] = None
+
+    async def enqueue_later(self, job_id: int, delay: float):
+        await asyncio.sleep(delay)
+        self.enqueue(job_id)
+
+    @timed("background")
+    async def run_job(self, job_id: int):
+        job = await self.storage.load_job(job_id)
+        guild = bot.get_guild(job['guild_id']) if job else None
+        if guild is None:
+            print(f"⚠️ Bulk job #{job_id} skipped: guild not available")
+            return
+        if job['status'] == 'done':
+            return
+
+        if not await shared_state.claim(f"job:{job_id}", PROCESS_ID, JOB_LEASE_SECONDS):
+            print(f"ℹ️ Bulk job #{job_id} is running in another process, checking again later")
+            spawn(self.enqueue_later(job_id, JOB_LEASE_SECONDS / 4))
+            return
+        try:
+            job = await self.storage.load_job(job_id)
+            if job['status'] != 'done':
+                await self.process_job(job, guild)
+        finally:
+            await shared_state.release(f"job:{job_id}", PROCESS_ID)
+
+    async def process_job(self, job: dict, guild: discord.Guild):
+        job_id = job['id']
+        await self.storage.update_job(job_id, status='running')
+        items = await self.storage.load_job_items(job_id)
+        groups = {}
+        for user_id, role_id, action, status, _, duration in items:
+            if status in ('pending', 'applying'):
+                groups.setdefault((role_id, action), []).append((user_id, status, duration))
+
+        total = len(items)
+        completed = total - sum(map(len, groups.values()))
+        last_report = 0.0
+
+        for (role_id, action), pending in groups.items():
+            role = guild.get_role(role_id)
+            for start in range(0, len(pending), self.chunk_size):
+                chunk = pending[start:start + self.chunk_size]
+                updates = []
+                if role is None:
+                    updates = [(user_id, role_id, 'failed', f"<@{user_id}> (role not found)") for user_id, *_ in chunk]
+                else:
+                    updates = await self.apply_chunk(job, guild, role, action, chunk)
+                await self.storage.update_job_items(job_id, updates)
+                await shared_state.claim(f"job:{job_id}", PROCESS_ID, JOB_LEASE_SECONDS)
+
+                completed += len(chunk)
+                if time.monotonic() - last_report >= BULK_JOB_PROGRESS_INTERVAL:
+                    last_report = time.monotonic()
+                    await self.edit_message(job, content=f"⏳ Bulk job **#{job_id}**: {completed}/{total} processed")
+
+        items = await self.storage.load_job_items(job_id)
+        await self.storage.update_job(job_id, status='done')
+        await self.finish(job, guild, items)
+
+    async def apply_chunk(self, job: dict, guild: discord.Guild, role: discord.Role, action: str, chunk) -> list:
+        await self.storage.update_job_items(
+            job['id'],
+            [(user_id, role.id, 'applying', None) for user_id, status, _ in chunk if status == 'pending']
+        )
+        user_ids = [user_id for user_id, *_ in chunk]
+        durations = {user_id: duration for user_id, _, duration in chunk if duration}
+        members = await self.resolver.resolve(guild, user_ids, self.resolved.get(job['id'], ()))
+
+        updates = []
+        audit_entries = []
+        expiries = []
+
+        def record(user_id: int, ok: bool, text: str):
+            if ok:
+                membership_index.apply(action, role.id, user_id)
+                if action == "give" and user_id in durations:
+                    expiries.append((user_id, role.id, "remove", time.time() + durations[user_id], None))
+            updates.append((user_id, role.id, 'done' if ok else 'failed', text))
+            audit_entries.append((
+                time.time(), guild.id, job['actor_id'],
+                user_id, role.id, action, int(ok), None if ok else text
+            ))
+
+        remaining = []
+        for user_id, status, _ in chunk:
+            member = members.get(user_id)
+            already_applied = member is not None and role_gate.has_role(member, role.id) == (action == "give")
+            if status == 'applying' and already_applied:
+                record(user_id, True, member.mention)
+            else:
+                remaining.append(user_id)
+
+        await self.executor.run(guild, role, action, remaining, job['reason'], members=members, on_result=record)
+        audit_log.record(audit_entries)
+        if expiries:
+            await role_scheduler.schedule(guild.id, job['actor_id'], expiries, f"Temporary {role.name} grant expired")
+        return updates
+
+    async def finish(self, job: dict, guild: discord.Guild, items):
+        success_list = [detail for _, _, _, status, detail, _ in items if status == 'done']
+        failed_list = [detail for _, _, _, status, detail, _ in items if status == 'failed']
+        actions = {action for _, _, action, *_ in items}
+        role_ids = list(dict.fromkeys(role_id for _, role_id, *_ in items))
+
+        unresolved = json.loads(job['unresolved']) if job['unresolved'] else None
+        if unresolved is not None:
+            failed_list += [f"`{value}` ({reason})" for _, value, _, _, reason in unresolved]
+            role_ids += [role_id for _, _, role_id, _, _ in unresolved if role_id and role_id not in role_ids]
+
+        payload = render_bulk_results(
+            actions.pop() if len(actions) == 1 else None,
+            [f"<@&{role_id}>" for role_id in role_ids],
+            f"<@{job['actor_id']}>",
+            success_list,
+            failed_list,
+            footer=f"Bulk job #{job['id']}",
+            make_report=lambda: build_result_csv(guild, items, unresolved or ()),
+            force_report=unresolved is not None,
+            filename=f"bulk_job_{job['id']}.csv"
+        )
+
+        await self.edit_message(job, content=None, embeds=payload.embeds, attachments=payload.files())
+
+        config = guild_configs.get(guild.id)
+        if config and config.log_channel_id:
+            log_sink.post(config.log_channel_id, payload)
+
+
+class RoleScheduler:
+    def __init__(self, storage: StorageBackend, jobs: BulkJobQueue, coalesce_window: float = SCHEDULE_COALESCE_WINDOW):
+        self.storage = storage
+        self.jobs = jobs
+        self.coalesce_window = coalesce_window
+        self.heap = []
+        self._wakeup = None
+        self._task = None
+
+    def __len__(self):
+        return len(self.heap)
+
+    async def load(self):
+        self.heap = await self.storage.load_schedule()
+        heapq.heapify(self.heap)
+        if self.heap:
+            print(f"ℹ️ Loaded {len(self.heap)} scheduled role change(s)")
+
+    def start(self):
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = spawn(self._loop())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def schedule(self, guild_id: int, actor_id: int, entries, reason: str) -> list:
+        entries = [
+            (due_at, guild_id, actor_id, user_id, role_id, action, duration, reason)
+            for user_id, role_id, action, due_at, duration in entries
+        ]
+        ids = await self.storage.schedule_role_changes(entries)
+        earliest = self.heap[0][0] if self.heap else None
+        for entry, schedule_id in zip(entries, ids):
+            heapq.heappush(self.heap, (entry[0], schedule_id))
+        if self._wakeup is not None and (earliest is None or self.heap[0][0] < earliest):
+            self._wakeup.set()
+        return ids
+
+    async def _loop(self):
+        while True:
+            self._wakeup.clear()
+            timeout = self.heap[0][0] - time.time() if self.heap else None
+            if timeout is None or timeout > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await self.fire_due()
+            except Exception as e:
+                print(f"❌ Failed to run scheduled role changes: {e}")
+                await asyncio.sleep(5)
+
+    @timed("background")
+    async def fire_due(self):
+        cutoff = time.time() + self.coalesce_window
+        due_ids = []
+        while self.heap and self.heap[0][0] <= cutoff:
+            due_ids.append(heapq.heappop(self.heap)[1])
+
+        groups = {}
+        claimed = []
+        handled = set()
+        try:
+            for schedule_id, guild_id, actor_id, user_id, role_id, action, duration, reason in await self.storage.load_scheduled(due_ids):
+                handled.add(schedule_id)
+                if bot.get_guild(guild_id) is None:
+                    heapq.heappush(self.heap, (time.time() + SHARD_RETRY_DELAY, schedule_id))
+                    continue
+                if not await shared_state.claim(f"schedule:{schedule_id}", PROCESS_ID, 3600):
+                    continue
+                handled.discard(schedule_id)
+                claimed.append(schedule_id)
+                groups.setdefault((guild_id, actor_id, reason), []).append((schedule_id, (user_id, role_id, action, duration)))
+
+            for (guild_id, actor_id, reason), entries in groups.items():
+                await self.jobs.submit(guild_id, actor_id, reason, [item for _, item in entries])
+                ids = [schedule_id for schedule_id, _ in entries]
+                handled.update(ids)
+                await self.storage.delete_scheduled(ids)
+        except Exception:
+            for schedule_id in due_ids:
+                if schedule_id not in handled:
+                    heapq.heappush(self.heap, (time.time(), schedule_id))
+            for schedule_id in claimed:
+                if schedule_id not in handled:
+                    await shared_state.release(f"schedule:{schedule_id}", PROCESS_ID)
+            raise
+        print(f"⏰ Submitted {len(claimed)} scheduled role change(s) in {len(groups)} job(s)")
+
+
+class BulkResultPayload:
+    def __init__(self, embeds, report: Optional[bytes] = None, filename: str = "results.csv"):
+        self.embeds = embeds
+        self.report = report
+        self.filename = filename
+
+    def files(self) -> list:
+        if self.report is None:
+            return []
+        return [discord.File(io.BytesIO(self.report), filename=self.filename)]
+
+
+def pack_field_values(lines, limit: int = EMBED_FIELD_LIMIT) -> list:
+    values = []
+    current = ""
+    for line in lines:
+        line = line if len(line) <= limit else line[:limit - 1] + "…"
+        if current and len(current) + 1 + len(line) > limit:
+            values.append(current)
+            current = line
+        else:
+            current = f"{current}\n{line}" if current else line
+    values.append(current or "*None*")
+    return values
+
+
+def pack_embeds(title: str, color: discord.Color, fields, footer: Optional[str] = None) -> Optional[list]:
+    budget = EMBED_TOTAL_LIMIT - len(title) - len(footer or "")
+    embeds = []
+    for name, value, inline in fields:
+        budget -= len(name) + len(value)
+        if budget < 0:
+            return None
+        if not embeds or len(embeds[-1].fields) >= EMBED_FIELD_COUNT:
+            if len(embeds) >= MESSAGE_EMBED_LIMIT:
+                return None
+            embeds.append(discord.Embed(
+                title=None if embeds else title,
+                color=color,
+                timestamp=discord.utils.utcnow()
+            ))
+        embeds[-1].add_field(name=name, value=value, inline=inline)
+    if footer:
+        embeds[-1].set_footer(text=footer)
+    return embeds
+
+
+def render_bulk_results(action: Optional[str], role_mentions, actor_mention: str, success_list, failed_list,
+                        footer: Optional[str] = None, make_report=None,
+                        force_report: bool = False, filename: str = "results.csv") -> BulkResultPayload:
+    title = f"🔄 Bulk Role {action.capitalize()} Results" if action else "🔄 Bulk Role Results"
+    color = discord.Color.green() if action == "give" else discord.Color.orange()
+    details = [
+        ("🏷️ Role", " ".join(role_mentions)[:EMBED_FIELD_LIMIT] or "*None*", True),
+        ("👤 Performed by", actor_mention, True),
+    ]
+
+    embeds = None
+    inline_results = len(success_list) + len(failed_list) <= RESULT_INLINE_LIMIT
+    if not force_report and (inline_results or make_report is None):
+        fields = []
+        for label, lines in (("✅ Success", success_list), ("❌ Failed", failed_list)):
+            for index, value in enumerate(pack_field_values(lines)):
+                fields.append((f"{label} ({len(lines)})" if index == 0 else f"{label} (cont.)", value, False))
+        embeds = pack_embeds(title, color, fields + details, footer)
+
+    if embeds is not None:
+        return BulkResultPayload(embeds)
+
+    fields = [
+        (f"✅ Success ({len(success_list)})", "📎 See attached report", False),
+        (f"❌ Failed ({len(failed_list)})", "📎 See attached report", False),
+    ]
+    report = make_report() if make_report else "\n".join(success_list + failed_list).encode()
+    return BulkResultPayload(pack_embeds(title, color, fields + details, footer), report, filename)
+
+
+def build_result_csv(guild: discord.Guild, items, unresolved=()) -> bytes:
+    role_names = {role_id: name for name, role_id in guild_configs.roles(guild.id).items()}
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(["line", "input", "user_id", "member", "role", "action", "status", "detail"])
+    for line, value, role_id, action, reason in unresolved:
+        writer.writerow([line, value, "", "", role_names.get(role_id, role_id or ""), action or "", "failed", reason])
+    for user_id, role_id, action, status, detail, _ in items:
+        member = guild.get_member(user_id)
+        reason = detail.partition(" (")[2].rstrip(")") if detail and status != 'done' else ""
+        writer.writerow([
+            "", "", user_id, member.name if member else "",
+            role_names.get(role_id, role_id), action, status, reason
+        ])
+    return output.getvalue().encode()
+
+
+class LogSink:
+    def __init__(self, maxsize: int = LOG_QUEUE_SIZE, window: float = LOG_COALESCE_WINDOW,
+                 spill_path: str = LOG_SPILL_FILE):
+        self.window = window
+        self.spill_path = spill_path
+        self.queue = asyncio.Queue(maxsize)
+        self.carry = None
+        self.inflight = []
+        self.closing = False
+        self.messages_sent = 0
+        self.payloads_sent = 0
+        self.payloads_spilled = 0
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self.closing = False
+            self.restore_spilled()
+            self._task = spawn(self._run())
+
+    def post(self, channel_id: int, payload: BulkResultPayload):
+        try:
+            self.queue.put_nowait((channel_id, payload))
+        except asyncio.QueueFull:
+            self.spill([(channel_id, payload)])
+
+    def spill(self, entries):
+        with open(self.spill_path, 'a', encoding='utf-8') as f:
+            for channel_id, payload in entries:
+                f.write(json.dumps({
+                    'channel_id': channel_id,
+                    'embeds': [embed.to_dict() for embed in payload.embeds],
+                    'report': base64.b64encode(payload.report).decode() if payload.report is not None else None,
+                    'filename': payload.filename,
+                }) + "\n")
+        self.payloads_spilled += len(entries)
+
+    def restore_spilled(self):
+        if not os.path.exists(self.spill_path):
+            return
+        with open(self.spill_path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+        os.remove(self.spill_path)
+
+        overflow = []
+        for line in lines:
+            data = json.loads(line)
+            if not data.get('channel_id'):
+                continue
+            entry = (data['channel_id'], BulkResultPayload(
+                [discord.Embed.from_dict(embed) for embed in data['embeds']],
+                base64.b64decode(data['report']) if data['report'] is not None else None,
+                data['filename']
+            ))
+            if self.queue.full():
+                overflow.append(entry)
+            else:
+                self.queue.put_nowait(entry)
+        if overflow:
+            self.spill(overflow)
+        print(f"ℹ️ Restored {len(lines) - len(overflow)} spilled log message(s)")
+
+    def fits(self, batch, entry) -> bool:
+        channel_id, payload = entry
+        if channel_id != batch[0][0]:
+            return False
+        batch = [p for _, p in batch]
+        embeds = sum(len(p.embeds) for p in batch) + len(payload.embeds)
+        size = sum(len(embed) for p in batch for embed in p.embeds) + sum(len(embed) for embed in payload.embeds)
+        files = sum(p.report is not None for p in batch) + (payload.report is not None)
+        return embeds <= MESSAGE_EMBED_LIMIT and size <= EMBED_TOTAL_LIMIT and files <= MESSAGE_EMBED_LIMIT
+
+    async def _next(self, timeout: Optional[float] = None):
+        if self.carry is not None:
+            entry, self.carry = self.carry, None
+            return entry
+        if timeout is None:
+            return await self.queue.get()
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    async def _run(self):
+        await bot.wait_until_ready()
+        loop = asyncio.get_running_loop()
+        while True:
+            if self.queue.empty() and self.carry is None:
+                self.restore_spilled()
+            batch = [await self._next()]
+            deadline = loop.time() + self.window
+            while not self.closing:
+                try:
+                    entry = await self._next(max(deadline - loop.time(), 0))
+                except asyncio.TimeoutError:
+                    break
+                if not self.fits(batch, entry):
+                    self.carry = entry
+                    break
+                batch.append(entry)
+
+            self.inflight = batch
+            delivered = await self.deliver(batch)
+            if not delivered:
+                self.spill(batch)
+            self.inflight = []
+            for _ in batch:
+                self.queue.task_done()
+            if not delivered:
+                await asyncio.sleep(LOG_RETRY_DELAY)
 
+    @timed("background")
+    async def deliver(self, batch) -> bool:
+        channel_id = batch[0][0]
+        channel = bot.get_channel(channel_id)
+        if channel is None:
+            print(f"⚠️ Log channel {channel_id} not found, dropping {len(batch)} log message(s)")
+            return True
 
-class TempDataManager:
-    def __init__(self):
-        self.data = {}
-        self.timestamps = {}
-        self._task_started = False
-    
-    def start_cleanup(self):
-        if not self._task_started:
-            self.cleanup_task.start()
-            self._task_started = True
-    
-    def set(self, user_id: int, data: dict):
-        self.data[user_id] = data
-        self.timestamps[user_id] = datetime.utcnow()
-    
-    def get(self, user_id: int) -> Optional[dict]:
-        return self.data.get(user_id)
-    
-    def delete(self, user_id: int):
-        self.data.pop(user_id, None)
-        self.timestamps.pop(user_id, None)
-    
-    @tasks.loop(minutes=5)
-    async def cleanup_task(self):
-        now = datetime.utcnow()
-        expired = [
-            uid for uid, ts in self.timestamps.items()
-            if now - ts > timedelta(minutes=10)
-        ]
-        for uid in expired:
-            self.delete(uid)
-        if expired:
-            print(f"🧹 Cleaned up {len(expired)} expired temp data entries")
+        for attempt in range(3):
+            try:
+                await channel.send(
+                    embeds=[embed for _, payload in batch for embed in payload.embeds],
+                    files=[file for _, payload in batch for file in payload.files()]
+                )
+                self.messages_sent += 1
+                self.payloads_sent += len(batch)
+                return True
+            except discord.HTTPException as e:
+                if e.status < 500:
+                    print(f"❌ Failed to send log: {e}")
+                    return True
+                await asyncio.sleep(2 ** attempt)
+        return False
 
+    async def close(self, timeout: float = LOG_DRAIN_TIMEOUT):
+        if self._task is None:
+            return
+        self.closing = True
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            print("⚠️ Timed out draining log messages, spilling the rest to disk")
+        self._task.cancel()
+        self._task = None
 
-class ConfirmButton(discord.ui.View):
-    def __init__(self):
-        super().__init__(timeout=60)
-        self.value = None
-    
-    @discord.ui.button(label="✅ Confirm", style=discord.ButtonStyle.success)
-    async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.value = True
-        self.stop()
-        await interaction.response.defer()
-    
-    @discord.ui.button(label="❌ Cancel", style=discord.ButtonStyle.danger)
-    async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.value = False
-        self.stop()
-        await interaction.response.send_message("❌ Action cancelled", ephemeral=True)
+        remaining = list(self.inflight) + ([self.carry] if self.carry is not None else [])
+        for _ in remaining:
+            self.queue.task_done()
+        while not self.queue.empty():
+            remaining.append(self.queue.get_nowait())
+            self.queue.task_done()
+        self.inflight = []
+        self.carry = None
+        if remaining:
+            self.spill(remaining)
 
 
 class RoleManagementView(discord.ui.View):
-    def __init__(self, temp_data_manager: TempDataManager):
+    def __init__(self, panel: PanelConfig):
         super().__init__(timeout=None)
-        self.temp_data_manager = temp_data_manager
+        self.panel = panel
         
-        give_role_options = [
-            discord.SelectOption(
-                label=name,
-                value=f"give_{role_id}",
-                description=f"Give {name} role",
-                emoji="✅"
-            )
-            for name, role_id in MANAGEABLE_ROLES.items()
-        ]
         give_role_select = discord.ui.Select(
             placeholder="Select role to GIVE",
-            options=give_role_options,
-            custom_id="give_role_select",
+            options=panel.select_options("give"),
+            custom_id=f"{panel.custom_id}:give",
             row=0
         )
         give_role_select.callback = self.role_select_callback
         self.add_item(give_role_select)
         
-        remove_role_options = [
-            discord.SelectOption(
-                label=name,
-                value=f"remove_{role_id}",
-                description=f"Remove {name} role",
-                emoji="🗑️"
-            )
-            for name, role_id in MANAGEABLE_ROLES.items()
-        ]
         remove_role_select = discord.ui.Select(
             placeholder="Select role to REMOVE",
-            options=remove_role_options,
-            custom_id="remove_role_select",
+            options=panel.select_options("remove"),
+            custom_id=f"{panel.custom_id}:remove",
             row=1
         )
         remove_role_select.callback = self.role_select_callback
         self.add_item(remove_role_select)
-        
-        user_select = discord.ui.UserSelect(
-            placeholder="Select one or more target members",
-            custom_id="user_select",
-            min_values=1,
-            max_values=10,
-            row=2
-        )
-        user_select.callback = self.user_select_callback
-        self.add_item(user_select)
 
-    def has_permission(self, interaction: discord.Interaction) -> bool:
-        helper_role = interaction.guild.get_role(HELPER_ROLE_ID)
-        is_admin = interaction.user.guild_permissions.administrator
-        has_helper = helper_role in interaction.user.roles if helper_role else False
-        return is_admin or has_helper
+    def has_permission(self, interaction: discord.Interaction, role_id: Optional[int] = None) -> bool:
+        return has_panel_permission(interaction, role_id)
 
+    @timed("component")
     async def role_select_callback(self, interaction: discord.Interaction):
         if not self.has_permission(interaction):
             await interaction.response.send_message(
@@ -184,10 +2312,10 @@ class RoleManagementView(discord.ui.View):
         role_id = int(selected.replace(f'{action}_', ''))
         
         role_name = next(
-            (name for name, rid in MANAGEABLE_ROLES.items() if rid == role_id),
-            "Unknown"
+            (name for name, rid in self.panel.roles.items() if rid == role_id),
+            None
         )
-        role = interaction.guild.get_role(role_id)
+        role = interaction.guild.get_role(role_id) if role_name else None
         
         if not role:
             await interaction.response.send_message(
@@ -195,6 +2323,13 @@ class RoleManagementView(discord.ui.View):
                 ephemeral=True
             )
             return
+
+        if not self.has_permission(interaction, role_id):
+            await interaction.response.send_message(
+                f"❌ You are not allowed to manage {role.mention}!",
+                ephemeral=True
+            )
+            return
         
         if role >= interaction.guild.me.top_role:
             await interaction.response.send_message(
@@ -203,179 +2338,394 @@ class RoleManagementView(discord.ui.View):
             )
             return
         
-        self.temp_data_manager.set(interaction.user.id, {
-            'role_id': role_id,
-            'role_name': role_name,
-            'action': action,
-            'role_mention': role.mention
-        })
-        
         await interaction.response.send_message(
-            f"✅ Role **{role.mention}** selected to **{action.upper()}**.\n"
+            f"✅ Role **{role.mention}** ({role_name}) selected to **{action.upper()}**.\n"
             "👉 Now select one or more target members using the dropdown below.",
+            view=member_picker_view(action, role_id, interaction.user.id),
             ephemeral=True
         )
 
-    async def user_select_callback(self, interaction: discord.Interaction):
-        if not self.has_permission(interaction):
+
+def base36(value: int) -> str:
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    result = ""
+    while value:
+        value, remainder = divmod(value, 36)
+        result = digits[remainder] + result
+    return result or "0"
+
+
+def sign_selection(action: str, role_id: int, user_id: int, hours: int, expires: str) -> str:
+    message = f"{action}:{role_id}:{user_id}:{hours}:{expires}".encode()
+    return hmac.new(PANEL_SECRET, message, hashlib.sha256).hexdigest()[:16]
+
+
+def panel_view(panel: PanelConfig) -> RoleManagementView:
+    return panel.cached('view', lambda: RoleManagementView(panel))
+
+
+class MemberSelect(
+    discord.ui.DynamicItem[discord.ui.UserSelect],
+    template=r"rs:(?P<action>[gr]):(?P<role_id>\d+):(?P<user_id>\d+):(?P<hours>\d+):(?P<expires>[0-9a-z]+):(?P<signature>[0-9a-f]{16})"
+):
+    def __init__(self, action: str, role_id: int, user_id: int, hours: int = 0, expires: Optional[str] = None,
+                 signature: Optional[str] = None):
+        action = action[0]
+        if expires is None:
+            expires = base36(int(time.time()) + SELECTION_TOKEN_TTL)
+            signature = sign_selection(action, role_id, user_id, hours, expires)
+        super().__init__(discord.ui.UserSelect(
+            placeholder="Select one or more target members",
+            custom_id=f"rs:{action}:{role_id}:{user_id}:{hours}:{expires}:{signature}",
+            min_values=1,
+            max_values=10
+        ))
+        self.action = "give" if action == "g" else "remove"
+        self.role_id = role_id
+        self.user_id = user_id
+        self.hours = hours
+        self.expires_at = int(expires, 36)
+        self.valid = hmac.compare_digest(signature, sign_selection(action, role_id, user_id, hours, expires))
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.UserSelect, match):
+        return cls(
+            match['action'],
+            int(match['role_id']),
+            int(match['user_id']),
+            int(match['hours']),
+            match['expires'],
+            match['signature']
+        )
+
+    @timed("component")
+    async def callback(self, interaction: discord.Interaction):
+        if not has_panel_permission(interaction, self.role_id):
             await interaction.response.send_message(
                 "❌ You don't have permission to use this panel!", 
                 ephemeral=True
             )
             return
 
-        temp_data = self.temp_data_manager.get(interaction.user.id)
-        if not temp_data:
+        if (not self.valid or self.user_id != interaction.user.id
+                or self.role_id not in guild_configs.roles(interaction.guild_id).values()):
             await interaction.response.send_message(
                 "❌ Please select a role first!", 
                 ephemeral=True
             )
             return
 
-        selected_user_ids = interaction.data['values']
-        role_id = temp_data['role_id']
-        role_name = temp_data['role_name']
-        action = temp_data['action']
-        role = interaction.guild.get_role(role_id)
+        if self.expires_at < time.time():
+            await interaction.response.send_message(
+                "⏰ This selection has expired. Please select the role again from the panel.",
+                ephemeral=True
+            )
+            return
 
-        await interaction.response.defer(ephemeral=True)
+        role = interaction.guild.get_role(self.role_id)
+        if not role:
+            await interaction.response.send_message(
+                "❌ Role not found in server!", 
+                ephemeral=True
+            )
+            return
 
-        if len(selected_user_ids) > 3:
-            confirm_view = ConfirmButton()
-            confirm_message = await interaction.followup.send(
-                f"⚠️ You are about to **{action}** {role.mention} for **{len(selected_user_ids)} members**.\n\n"
-                "Are you sure?",
-                view=confirm_view,
-                ephemeral=True,
-                wait=True
+        selection_key = f"selection:{self.item.custom_id}:{','.join(sorted(interaction.data['values']))}"
+        if not await shared_state.claim(selection_key, str(interaction.id), SELECTION_DEDUP_TTL):
+            await interaction.response.send_message(
+                "⏳ This selection is already being processed!",
+                ephemeral=True
             )
-            
-            await confirm_view.wait()
-            if not confirm_view.value:
-                await confirm_message.edit(content="❌ Action cancelled", view=None)
-                return
-            
-            try:
-                await confirm_message.delete()
-            except:
-                pass
+            return
 
-        success_list = []
-        failed_list = []
+        await apply_member_selection(
+            interaction,
+            role,
+            self.action,
+            interaction.data['values'],
+            list(self.item.values),
+            hours=self.hours
+        )
 
-        for user_id in selected_user_ids:
-            try:
-                member = await interaction.guild.fetch_member(int(user_id))
-                
-                if member.bot:
-                    failed_list.append(f"{member.mention} (cannot manage bots)")
-                    continue
-                
-                if member.top_role >= interaction.guild.me.top_role:
-                    failed_list.append(f"{member.mention} (higher role than bot)")
-                    continue
 
-                if action == "give":
-                    if role in member.roles:
-                        failed_list.append(f"{member.mention} (already has role)")
-                        continue
-                    await member.add_roles(role, reason=f"Role management by {interaction.user}")
-                else:
-                    if role not in member.roles:
-                        failed_list.append(f"{member.mention} (no role to remove)")
-                        continue
-                    await member.remove_roles(role, reason=f"Role management by {interaction.user}")
-                
-                success_list.append(member.mention)
-
-            except discord.Forbidden:
-                failed_list.append(f"<@{user_id}> (permission denied)")
-            except discord.HTTPException:
-                failed_list.append(f"<@{user_id}> (network error)")
-            except Exception as e:
-                failed_list.append(f"<@{user_id}> (error: {type(e).__name__})")
+def format_hours(hours: int) -> str:
+    if hours % 24 == 0:
+        days = hours // 24
+        return f"{days} day{'s' if days != 1 else ''}"
+    return f"{hours} hour{'s' if hours != 1 else ''}"
 
-        summary_embed = discord.Embed(
-            title=f"🔄 Bulk Role {action.capitalize()} Results",
-            color=discord.Color.green() if action == "give" else discord.Color.orange(),
-            timestamp=discord.utils.utcnow()
-        )
-        
-        summary_embed.add_field(
-            name=f"✅ Success ({len(success_list)})", 
-            value="\n".join(success_list) or "*None*", 
-            inline=False
+
+class GrantDurationSelect(
+    discord.ui.DynamicItem[discord.ui.Select],
+    template=r"rd:(?P<role_id>\d+):(?P<user_id>\d+)"
+):
+    def __init__(self, role_id: int, user_id: int, hours: int = 0):
+        options = [discord.SelectOption(label="Permanent", value="0", emoji="♾️", default=hours == 0)]
+        options += [
+            discord.SelectOption(label=f"For {format_hours(h)}", value=str(h), emoji="⏳", default=hours == h)
+            for h in GRANT_DURATIONS
+        ]
+        super().__init__(discord.ui.Select(
+            placeholder="Grant duration",
+            custom_id=f"rd:{role_id}:{user_id}",
+            options=options
+        ))
+        self.role_id = role_id
+        self.user_id = user_id
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Select, match):
+        return cls(int(match['role_id']), int(match['user_id']))
+
+    @timed("component")
+    async def callback(self, interaction: discord.Interaction):
+        if not has_panel_permission(interaction, self.role_id) or self.user_id != interaction.user.id:
+            await interaction.response.send_message(
+                "❌ You don't have permission to use this panel!",
+                ephemeral=True
+            )
+            return
+
+        hours = int(interaction.data['values'][0])
+        await interaction.response.edit_message(
+            view=member_picker_view("give", self.role_id, self.user_id, hours)
         )
-        summary_embed.add_field(
-            name=f"❌ Failed ({len(failed_list)})", 
-            value="\n".join(failed_list) or "*None*", 
-            inline=False
+
+
+def member_picker_view(action: str, role_id: int, user_id: int, hours: int = 0) -> discord.ui.View:
+    view = discord.ui.View(timeout=None)
+    if action == "give":
+        view.add_item(GrantDurationSelect(role_id, user_id, hours))
+    view.add_item(MemberSelect(action, role_id, user_id, hours))
+    return view
+
+
+async def apply_member_selection(interaction: discord.Interaction, role: discord.Role, action: str,
+                                 selected_user_ids, resolved_members, hours: int = 0):
+    await interaction.response.defer(ephemeral=True)
+
+    members = await member_resolver.resolve(interaction.guild, [int(user_id) for user_id in selected_user_ids],
+                                            resolved_members)
+    approved, rejected = plan_role_changes(
+        interaction.guild,
+        [(int(user_id), role.id, action, hours * 3600 if hours else None) for user_id in selected_user_ids],
+        members
+    )
+
+    if not approved:
+        await interaction.followup.send(
+            "ℹ️ Nothing to change.",
+            embed=render_plan_preview(role, action, approved, rejected, hours),
+            ephemeral=True
         )
-        summary_embed.add_field(name="🏷️ Role", value=role.mention, inline=True)
-        summary_embed.add_field(
-            name="👤 Performed by", 
-            value=interaction.user.mention, 
-            inline=True
+        return
+
+    if len(selected_user_ids) > 3:
+        preview_view = PlanPreviewView(interaction.user.id)
+        preview_message = await interaction.followup.send(
+            embed=render_plan_preview(role, action, approved, rejected, hours),
+            view=preview_view,
+            ephemeral=True,
+            wait=True
         )
+        
+        await preview_view.wait()
+        if not preview_view.value:
+            await preview_message.edit(content="❌ Action cancelled", view=None)
+            return
+        
+        try:
+            await preview_message.delete()
+        except:
+            pass
+
+    await bulk_jobs.submit(
+        interaction.guild.id,
+        interaction.user.id,
+        f"Role management by {interaction.user}",
+        approved,
+        interaction=interaction,
+        resolved=list(members.values()),
+        rejected=rejected
+    )
 
-        await interaction.followup.send(embed=summary_embed, ephemeral=True)
 
-        log_channel = interaction.guild.get_channel(LOG_CHANNEL_ID)
-        if log_channel:
-            try:
-                await log_channel.send(embed=summary_embed)
-            except Exception as e:
-                print(f"❌ Failed to send log: {e}")
+storage = SQLiteBackend()
+shared_state = open_shared_state()
+panel_data = PanelDataManager(storage, shared_state)
+audit_log = AuditLog(storage)
+guild_configs = GuildConfigRegistry.load()
+membership_index = RoleMembershipIndex({config.guild_id: config.role_ids for config in guild_configs})
+authorization = AuthorizationIndex(guild_configs)
+embed_cache = EmbedCache()
+member_browser = MemberBrowserIndex(membership_index)
+membership_index.listeners.append(embed_cache.invalidate_role)
+membership_index.listeners.append(member_browser.invalidate_role)
+role_gate = RoleOperationGate()
+bulk_executor = BulkRoleExecutor()
+member_resolver = MemberResolver()
+bulk_jobs = BulkJobQueue(storage, bulk_executor, member_resolver)
+role_scheduler = RoleScheduler(storage, bulk_jobs)
+log_sink = LogSink()
 
-        self.temp_data_manager.delete(interaction.user.id)
+metrics.register("rolebot_bulk_job_queue_depth", "gauge", "Bulk jobs waiting for a worker",
+                 lambda: bulk_jobs.queue.qsize())
+metrics.register("rolebot_bulk_jobs_active", "gauge", "Bulk jobs queued or running", lambda: len(bulk_jobs.active))
+metrics.register("rolebot_scheduled_changes", "gauge", "Pending scheduled role changes", lambda: len(role_scheduler))
+metrics.register("rolebot_log_queue_depth", "gauge", "Log payloads waiting to be sent", lambda: log_sink.queue.qsize())
+metrics.register("rolebot_log_messages_sent_total", "counter", "Log channel messages sent",
+                 lambda: log_sink.messages_sent)
+metrics.register("rolebot_log_payloads_spilled_total", "counter", "Log payloads spilled to disk",
+                 lambda: log_sink.payloads_spilled)
+metrics.register("rolebot_role_locks_held", "gauge", "(member, role) keys with a change in flight",
+                 lambda: len(role_gate.locks))
+metrics.register("rolebot_bulk_retries_total", "counter", "Role change retries after rate limits",
+                 lambda: bulk_executor.retries)
+metrics.register("rolebot_member_cache_hits_total", "counter", "Members resolved from the gateway cache",
+                 lambda: member_resolver.cache_hits)
+metrics.register("rolebot_member_gateway_hits_total", "counter", "Members resolved through member chunk requests",
+                 lambda: member_resolver.gateway_hits)
+metrics.register("rolebot_embed_cache_hits_total", "counter", "Rendered embed cache hits", lambda: embed_cache.hits)
+metrics.register("rolebot_embed_cache_misses_total", "counter", "Rendered embed cache misses",
+                 lambda: embed_cache.misses)
+metrics.register("rolebot_background_tasks", "gauge", "Fire-and-forget tasks in flight", lambda: len(background_tasks))
 
-temp_data_manager = TempDataManager()
 
+def command_tree_hash(guild: discord.abc.Snowflake) -> str:
+    commands_payload = sorted(
+        (command.to_dict(bot.tree) for command in bot.tree.get_commands(guild=guild)),
+        key=lambda command: (command.get('type', 1), command['name'])
+    )
+    return hashlib.sha256(json.dumps(commands_payload, sort_keys=True).encode()).hexdigest()
 
-@bot.event
-async def on_ready():
-    print(f"✅ Logged in as {bot.user}")
-    temp_data_manager.start_cleanup()
-    bot.add_view(RoleManagementView(temp_data_manager))
-    
-    await restore_panel()
-    
+
+@timed("startup")
+async def sync_commands(config: GuildConfig):
     try:
-        guild = discord.Object(id=GUILD_ID)
+        guild = discord.Object(id=config.guild_id)
         bot.tree.copy_global_to(guild=guild)
+        tree_hash = f"{bot.application_id}:{command_tree_hash(guild)}"
+        if panel_data.get('command_tree_hash', str(config.guild_id)) == tree_hash:
+            print(f"✅ Command tree unchanged for guild {config.guild_id}, skipping sync")
+            return
+
         synced = await bot.tree.sync(guild=guild)
-        print(f"✅ Synced {len(synced)} command(s) to guild {GUILD_ID}")
+        panel_data.set('command_tree_hash', tree_hash, str(config.guild_id))
+        print(f"✅ Synced {len(synced)} command(s) to guild {config.guild_id}")
     except Exception as e:
-        print(f"❌ Failed to sync commands: {e}")
+        print(f"❌ Failed to sync commands for guild {config.guild_id}: {e}")
+
+
+@bot.event
+@timed("startup")
+async def on_ready():
+    print(f"✅ Logged in as {bot.user}")
+
+    for config in guild_configs:
+        guild = bot.get_guild(config.guild_id)
+        if guild:
+            membership_index.build(guild)
+            authorization.build(guild)
+            role_gate.reset(guild.id)
+    print(f"✅ Indexed {sum(map(len, membership_index.members.values()))} managed role assignments")
+
+    if bot.initialized:
+        return
+    bot.initialized = True
+
+    results = await asyncio.gather(
+        bulk_jobs.resume(),
+        *(restore_panel(panel) for panel in guild_configs.panels()),
+        *(sync_commands(config) for config in guild_configs),
+        return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            print(f"❌ Startup task failed: {result}")
+    role_scheduler.start()
+
+    startup_seconds = time.perf_counter() - STARTED_AT
+    metrics.set("rolebot_startup_seconds", startup_seconds)
+    print(f"🚀 Ready {startup_seconds:.2f}s after launch")
+
+
+@bot.event
+async def on_member_join(member: discord.Member):
+    if guild_configs.get(member.guild.id):
+        membership_index.update_member(member)
+        authorization.update_member(member)
+        embed_cache.invalidate(role_stats_key(member.guild.id))
+
+
+@bot.event
+async def on_member_update(before: discord.Member, after: discord.Member):
+    if guild_configs.get(after.guild.id):
+        membership_index.update_member(after)
+        if before.roles != after.roles:
+            authorization.update_member(after)
+            role_gate.forget(after)
+        if before.display_name != after.display_name:
+            member_browser.invalidate_member(after)
+
+
+@bot.event
+async def on_member_remove(member: discord.Member):
+    if guild_configs.get(member.guild.id):
+        membership_index.remove_member(member)
+        authorization.remove_member(member)
+        role_gate.forget(member)
+        embed_cache.invalidate(role_stats_key(member.guild.id))
 
 
-async def restore_panel():
+@bot.event
+async def on_guild_role_update(before: discord.Role, after: discord.Role):
+    authorization.role_changed(before, after)
+    if after.id in guild_configs.roles(after.guild.id).values() and before.name != after.name:
+        embed_cache.invalidate_role(after.id)
+
+
+@bot.event
+async def on_guild_role_delete(role: discord.Role):
+    config = guild_configs.get(role.guild.id)
+    if config and role.guild.id in authorization.admins:
+        authorization.build(role.guild)
+    if config and role.id in config.role_ids:
+        for panel in config.panels.values():
+            panel.rendered.pop(('embed', panel.version), None)
+        embed_cache.invalidate_role(role.id)
+
+
+@timed("startup")
+async def restore_panel(panel: PanelConfig):
     try:
-        message_id = PanelDataManager.get_message_id()
+        message_id = await panel_data.get_message_id(panel)
         if not message_id:
-            print("ℹ️ No saved panel message found")
+            print(f"ℹ️ No saved panel message found for {panel.key}")
+            return
+
+        if panel_data.get('rendered_version', panel.key) == panel.version:
+            print(f"✅ Panel {panel.key} is up to date (role set {panel.version})")
             return
         
-        guild = bot.get_guild(GUILD_ID)
+        guild = bot.get_guild(panel.guild_id)
         if not guild:
-            print("❌ Guild not found")
+            print(f"❌ Guild {panel.guild_id} not found")
             return
         
-        channel = guild.get_channel(PANEL_CHANNEL_ID)
+        channel = guild.get_channel(panel.channel_id)
         if not channel:
-            print("❌ Panel channel not found")
+            print(f"❌ Panel channel not found for {panel.key}")
             return
         
         try:
             message = await channel.fetch_message(message_id)
-            
-            embed = message.embeds[0] if message.embeds else create_panel_embed(guild)
-            await message.edit(embed=embed, view=RoleManagementView(temp_data_manager))
-            print(f"✅ Panel restored from message ID: {message_id}")
+            await message.edit(embed=create_panel_embed(guild, panel), view=panel_view(panel))
+            panel_data.set('rendered_version', panel.version, panel.key)
+            print(f"✅ Panel {panel.key} restored from message ID: {message_id}")
             
         except discord.NotFound:
-            print("⚠️ Saved panel message not found, will need to create new one")
-            PanelDataManager.set_message_id(None)
+            print(f"⚠️ Saved panel message for {panel.key} not found, will need to create new one")
+            await panel_data.set_message_id(panel, None)
         except discord.Forbidden:
             print("❌ No permission to edit panel message")
             
@@ -383,23 +2733,27 @@ async def restore_panel():
         print(f"⚠️ Failed to restore panel: {e}")
 
 
-def create_panel_embed(guild: discord.Guild) -> discord.Embed:
+def create_panel_embed(guild: discord.Guild, panel: PanelConfig) -> discord.Embed:
+    return panel.cached('embed', lambda: render_panel_embed(guild, panel)).copy()
+
+
+def render_panel_embed(guild: discord.Guild, panel: PanelConfig) -> discord.Embed:
     embed = discord.Embed(
-        title="Role Management Panel",
+        title=panel.title,
         description=(
             "**How to use:**\n"
             "1️⃣ Select a role action (give/remove)\n"
             "2️⃣ Select one or more members (up to 10)\n"
             "3️⃣ Confirm if bulk action (>3 members)\n\n"
             "✅ **Top dropdown:** Give Role\n"
-            "🗑️ **Middle dropdown:** Remove Role\n"
-            "👥 **Bottom dropdown:** Select Members\n\n"
+            "🗑️ **Bottom dropdown:** Remove Role\n"
+            "👥 **Member dropdown:** Appears privately after you pick a role\n\n"
             "**Manageable Roles:**"
         ),
         color=discord.Color.blue()
     )
 
-    for name, role_id in MANAGEABLE_ROLES.items():
+    for name, role_id in panel.roles.items():
         role = guild.get_role(role_id)
         if role:
             embed.add_field(name=name, value=role.mention, inline=True)
@@ -408,18 +2762,45 @@ def create_panel_embed(guild: discord.Guild) -> discord.Embed:
     return embed
 
 
+async def panel_autocomplete(interaction: discord.Interaction, current: str) -> list:
+    config = guild_configs.get(interaction.guild_id)
+    return [
+        app_commands.Choice(name=name, value=name)
+        for name in (config.panels if config else ())
+        if current.lower() in name.lower()
+    ][:25]
+
+
+async def resolve_panel(interaction: discord.Interaction, name: Optional[str]) -> Optional[PanelConfig]:
+    config = guild_configs.get(interaction.guild_id)
+    panel = config.panel(name) if config else None
+    if panel is None:
+        await interaction.response.send_message(
+            f"❌ Unknown panel `{name}`!" if name else "❌ This server has no panels configured!",
+            ephemeral=True
+        )
+    return panel
+
+
 @bot.tree.command(name="setup_panel", description="Setup role helper panel (Admin only)")
 @app_commands.checks.has_permissions(administrator=True)
-async def setup_panel(interaction: discord.Interaction):
-    channel = interaction.guild.get_channel(PANEL_CHANNEL_ID)
+@app_commands.describe(panel="Panel to set up (defaults to the main panel)")
+@app_commands.autocomplete(panel=panel_autocomplete)
+@timed("command")
+async def setup_panel(interaction: discord.Interaction, panel: Optional[str] = None):
+    panel = await resolve_panel(interaction, panel)
+    if panel is None:
+        return
+
+    channel = interaction.guild.get_channel(panel.channel_id)
     if not channel:
         await interaction.response.send_message(
-            "❌ Panel channel not found! Check PANEL_CHANNEL_ID in .env", 
+            f"❌ Panel channel not found! Check the channel configured for `{panel.name}`", 
             ephemeral=True
         )
         return
 
-    existing_message_id = PanelDataManager.get_message_id()
+    existing_message_id = await panel_data.get_message_id(panel)
     if existing_message_id:
         try:
             existing_message = await channel.fetch_message(existing_message_id)
@@ -432,81 +2813,280 @@ async def setup_panel(interaction: discord.Interaction):
         except discord.NotFound:
             pass
 
-    embed = create_panel_embed(interaction.guild)
-    
-    try:
-        message = await channel.send(embed=embed, view=RoleManagementView(temp_data_manager))
-        
-        PanelDataManager.set_message_id(message.id)
-        
+    embed = create_panel_embed(interaction.guild, panel)
+    
+    try:
+        message = await channel.send(embed=embed, view=panel_view(panel))
+        
+        await panel_data.set_message_id(panel, message.id)
+        panel_data.set('rendered_version', panel.version, panel.key)
+        
+        await interaction.response.send_message(
+            f"✅ Panel successfully created in {channel.mention}\n"
+            f"Message ID `{message.id}` has been saved.",
+            ephemeral=True
+        )
+    except discord.Forbidden:
+        await interaction.response.send_message(
+            "❌ I don't have permission to send messages in that channel!", 
+            ephemeral=True
+        )
+
+
+@bot.tree.command(name="list_roles", description="List all manageable roles and their members")
+@timed("command")
+async def list_roles(interaction: discord.Interaction):
+    if not has_panel_permission(interaction):
+        await interaction.response.send_message(
+            "❌ You need Admin or Helper role to use this command!",
+            ephemeral=True
+        )
+        return
+    
+    roles = guild_configs.roles(interaction.guild_id)
+    key = ('list_roles', interaction.guild.id, tuple(roles.values()))
+    embed = embed_cache.get_or_render(key, roles.values(), lambda: render_list_roles_embed(interaction.guild, roles))
+    
+    view = discord.ui.View(timeout=None)
+    view.add_item(MemberBrowserRoleSelect(roles))
+    await interaction.response.send_message(
+        embed=personalize_embed(embed, interaction.user),
+        view=view,
+        ephemeral=True
+    )
+
+
+def render_list_roles_embed(guild: discord.Guild, roles: dict) -> discord.Embed:
+    embed = discord.Embed(
+        title="Manageable Roles Overview",
+        color=discord.Color.teal()
+    )
+    
+    total_members = 0
+    
+    for name, role_id in roles.items():
+        role = guild.get_role(role_id)
+        if not role:
+            embed.add_field(name=name, value="❌ Role not found", inline=False)
+            continue
+
+        member_count = membership_index.count(role_id)
+        total_members += member_count
+        
+        if member_count == 0:
+            value = "*No members have this role*"
+        else:
+            value = "\n".join(f"<@{member_id}>" for member_id in membership_index.sample(role_id, 10))
+            if member_count > 10:
+                value += f"\n*...and {member_count - 10} more (browse below)*"
+        
+        embed.add_field(
+            name=f"{role.name} ({member_count} members)", 
+            value=value, 
+            inline=False
+        )
+
+    embed.description = f"**Total members with managed roles:** {total_members}"
+    return embed
+
+
+def load_role_overrides():
+    for panel in guild_configs.panels():
+        roles = panel_data.get('roles', panel.key)
+        if roles is None:
+            continue
+        if panel_data.get('roles_base', panel.key) != panel.configured_version:
+            print(f"⚠️ Configured roles for panel {panel.key} changed since they were edited at runtime, "
+                  "discarding the runtime edits")
+            panel_data.set('roles', None, panel.key)
+            panel_data.set('roles_base', None, panel.key)
+            continue
+        panel.set_roles({name: int(role_id) for name, role_id in roles.items()})
+    for config in guild_configs:
+        config.refresh_roles()
+        membership_index.guild_roles[config.guild_id] = list(config.role_ids)
+
+
+async def update_panel_roles(guild: discord.Guild, panel: PanelConfig, roles: dict) -> str:
+    config = guild_configs.get(guild.id)
+    previous = set(config.role_ids)
+    panel.set_roles(roles)
+    panel_data.set('roles', panel.roles, panel.key)
+    panel_data.set('roles_base', panel.configured_version, panel.key)
+    config.refresh_roles()
+
+    membership_index.set_roles(guild, config.role_ids)
+    if guild.id in authorization.admins:
+        authorization.build(guild)
+    for role_id in previous | config.role_ids:
+        embed_cache.invalidate_role(role_id)
+    return await update_panel_message(guild, panel)
+
+
+async def update_panel_message(guild: discord.Guild, panel: PanelConfig) -> str:
+    message_id = await panel_data.get_message_id(panel)
+    if not message_id or panel_data.get('rendered_version', panel.key) == panel.version:
+        return "Panel message unchanged."
+
+    channel = guild.get_channel(panel.channel_id)
+    if not channel:
+        return "⚠️ Panel channel not found, panel message not updated."
+    try:
+        message = await channel.fetch_message(message_id)
+        await message.edit(embed=create_panel_embed(guild, panel), view=panel_view(panel))
+    except discord.NotFound:
+        await panel_data.set_message_id(panel, None)
+        return "⚠️ Panel message not found! Use `/setup_panel` to create a new one."
+    except discord.HTTPException as e:
+        return f"⚠️ Failed to update panel message: {e}"
+    panel_data.set('rendered_version', panel.version, panel.key)
+    return f"Panel message updated to role set `{panel.version}`."
+
+
+@bot.tree.command(name="add_managed_role", description="Add a role to a panel (Admin only)")
+@app_commands.checks.has_permissions(administrator=True)
+@app_commands.describe(
+    role="Role helpers may give and remove",
+    name="Label shown on the panel (defaults to the role name)",
+    panel="Panel to add it to (defaults to the main panel)"
+)
+@app_commands.autocomplete(panel=panel_autocomplete)
+@timed("command")
+async def add_managed_role(
+    interaction: discord.Interaction,
+    role: discord.Role,
+    name: Optional[str] = None,
+    panel: Optional[str] = None
+):
+    panel = await resolve_panel(interaction, panel)
+    if panel is None:
+        return
+
+    name = (name or role.name).strip().upper()[:ROLE_LABEL_LIMIT]
+    if not name:
+        await interaction.response.send_message(
+            "❌ Role labels can't be empty!",
+            ephemeral=True
+        )
+        return
+    if role.id in panel.roles.values() or name in panel.roles:
+        await interaction.response.send_message(
+            f"❌ {role.mention} or the label `{name}` is already on panel `{panel.name}`!",
+            ephemeral=True
+        )
+        return
+    if len(panel.roles) >= PANEL_ROLE_LIMIT:
+        await interaction.response.send_message(
+            f"❌ Panels can hold at most {PANEL_ROLE_LIMIT} roles!",
+            ephemeral=True
+        )
+        return
+    if role.is_default() or role.managed or role >= interaction.guild.me.top_role:
+        await interaction.response.send_message(
+            f"❌ I can't manage {role.mention}!",
+            ephemeral=True
+        )
+        return
+
+    status = await update_panel_roles(interaction.guild, panel, {**panel.roles, name: role.id})
+    await interaction.response.send_message(
+        f"✅ Added {role.mention} to panel `{panel.name}` as **{name}**. {status}",
+        ephemeral=True
+    )
+
+
+@bot.tree.command(name="remove_managed_role", description="Remove a role from a panel (Admin only)")
+@app_commands.checks.has_permissions(administrator=True)
+@app_commands.describe(
+    role="Role to remove from the panel",
+    panel="Panel to remove it from (defaults to the main panel)"
+)
+@app_commands.autocomplete(panel=panel_autocomplete)
+@timed("command")
+async def remove_managed_role(interaction: discord.Interaction, role: discord.Role, panel: Optional[str] = None):
+    panel = await resolve_panel(interaction, panel)
+    if panel is None:
+        return
+
+    if role.id not in panel.roles.values():
         await interaction.response.send_message(
-            f"✅ Panel successfully created in {channel.mention}\n"
-            f"Message ID `{message.id}` has been saved.",
+            f"❌ {role.mention} is not on panel `{panel.name}`!",
             ephemeral=True
         )
-    except discord.Forbidden:
+        return
+    if len(panel.roles) == 1:
         await interaction.response.send_message(
-            "❌ I don't have permission to send messages in that channel!", 
+            "❌ A panel needs at least one role! Use `/delete_panel` instead.",
             ephemeral=True
         )
+        return
+
+    roles = {name: role_id for name, role_id in panel.roles.items() if role_id != role.id}
+    status = await update_panel_roles(interaction.guild, panel, roles)
+    await interaction.response.send_message(
+        f"✅ Removed {role.mention} from panel `{panel.name}`. {status}",
+        ephemeral=True
+    )
 
 
-@bot.tree.command(name="list_roles", description="List all manageable roles and their members")
-async def list_roles(interaction: discord.Interaction):
-    helper_role = interaction.guild.get_role(HELPER_ROLE_ID)
-    is_admin = interaction.user.guild_permissions.administrator
-    has_helper = helper_role in interaction.user.roles if helper_role else False
-    
-    if not (is_admin or has_helper):
+@bot.tree.command(name="rename_managed_role", description="Rename a role's label on a panel (Admin only)")
+@app_commands.checks.has_permissions(administrator=True)
+@app_commands.describe(
+    role="Role to relabel",
+    name="New label shown on the panel",
+    panel="Panel to update (defaults to the main panel)"
+)
+@app_commands.autocomplete(panel=panel_autocomplete)
+@timed("command")
+async def rename_managed_role(
+    interaction: discord.Interaction,
+    role: discord.Role,
+    name: str,
+    panel: Optional[str] = None
+):
+    panel = await resolve_panel(interaction, panel)
+    if panel is None:
+        return
+
+    name = name.strip().upper()[:ROLE_LABEL_LIMIT]
+    if not name:
         await interaction.response.send_message(
-            "❌ You need Admin or Helper role to use this command!",
+            "❌ Role labels can't be empty!",
             ephemeral=True
         )
         return
-    
-    await interaction.response.defer(ephemeral=True)
-    
-    embed = discord.Embed(
-        title="Manageable Roles Overview",
-        color=discord.Color.teal(),
-        timestamp=discord.utils.utcnow()
-    )
-    
-    total_members = 0
-    
-    for name, role_id in MANAGEABLE_ROLES.items():
-        role = interaction.guild.get_role(role_id)
-        if not role:
-            embed.add_field(name=name, value="❌ Role not found", inline=False)
-            continue
-
-        members = role.members
-        total_members += len(members)
-        
-        if len(members) == 0:
-            value = "*No members have this role*"
-        elif len(members) <= 10:
-            value = "\n".join([m.mention for m in members])
-        else:
-            value = "\n".join([m.mention for m in members[:10]])
-            value += f"\n*...and {len(members) - 10} more*"
-        
-        embed.add_field(
-            name=f"{role.name} ({len(members)} members)", 
-            value=value, 
-            inline=False
+    if role.id not in panel.roles.values():
+        await interaction.response.send_message(
+            f"❌ {role.mention} is not on panel `{panel.name}`!",
+            ephemeral=True
         )
+        return
+    if panel.roles.get(name, role.id) != role.id:
+        await interaction.response.send_message(
+            f"❌ The label `{name}` is already used on panel `{panel.name}`!",
+            ephemeral=True
+        )
+        return
 
-    embed.description = f"**Total members with managed roles:** {total_members}"
-    embed.set_footer(text=f"Requested by {interaction.user.name}")
-    
-    await interaction.followup.send(embed=embed, ephemeral=True)
+    roles = {(name if role_id == role.id else label): role_id for label, role_id in panel.roles.items()}
+    status = await update_panel_roles(interaction.guild, panel, roles)
+    await interaction.response.send_message(
+        f"✅ {role.mention} is now labelled **{name}** on panel `{panel.name}`. {status}",
+        ephemeral=True
+    )
 
 
 @bot.tree.command(name="refresh_panel", description="Refresh existing panel (Admin only)")
 @app_commands.checks.has_permissions(administrator=True)
-async def refresh_panel(interaction: discord.Interaction):
-    message_id = PanelDataManager.get_message_id()
+@app_commands.describe(panel="Panel to refresh (defaults to the main panel)")
+@app_commands.autocomplete(panel=panel_autocomplete)
+@timed("command")
+async def refresh_panel(interaction: discord.Interaction, panel: Optional[str] = None):
+    panel = await resolve_panel(interaction, panel)
+    if panel is None:
+        return
+
+    message_id = await panel_data.get_message_id(panel)
     
     if not message_id:
         await interaction.response.send_message(
@@ -515,7 +3095,7 @@ async def refresh_panel(interaction: discord.Interaction):
         )
         return
     
-    channel = interaction.guild.get_channel(PANEL_CHANNEL_ID)
+    channel = interaction.guild.get_channel(panel.channel_id)
     if not channel:
         await interaction.response.send_message(
             "❌ Panel channel not found!",
@@ -525,8 +3105,9 @@ async def refresh_panel(interaction: discord.Interaction):
     
     try:
         message = await channel.fetch_message(message_id)
-        embed = create_panel_embed(interaction.guild)
-        await message.edit(embed=embed, view=RoleManagementView(temp_data_manager))
+        embed = create_panel_embed(interaction.guild, panel)
+        await message.edit(embed=embed, view=panel_view(panel))
+        panel_data.set('rendered_version', panel.version, panel.key)
         
         await interaction.response.send_message(
             f"✅ Panel refreshed successfully! [Jump to panel]({message.jump_url})",
@@ -538,7 +3119,7 @@ async def refresh_panel(interaction: discord.Interaction):
             "Use `/setup_panel` to create a new one.",
             ephemeral=True
         )
-        PanelDataManager.set_message_id(None)
+        await panel_data.set_message_id(panel, None)
     except Exception as e:
         await interaction.response.send_message(
             f"❌ Failed to refresh panel: {str(e)}",
@@ -546,34 +3127,42 @@ async def refresh_panel(interaction: discord.Interaction):
         )
 
 
+def role_stats_key(guild_id: int) -> tuple:
+    return ('role_stats', guild_id, tuple(guild_configs.roles(guild_id).values()))
+
+
 @bot.tree.command(name="role_stats", description="View role management statistics")
+@timed("command")
 async def role_stats(interaction: discord.Interaction):
-    helper_role = interaction.guild.get_role(HELPER_ROLE_ID)
-    is_admin = interaction.user.guild_permissions.administrator
-    has_helper = helper_role in interaction.user.roles if helper_role else False
-    
-    if not (is_admin or has_helper):
+    if not has_panel_permission(interaction):
         await interaction.response.send_message(
             "❌ You need Admin or Helper role to use this command!",
             ephemeral=True
         )
         return
     
+    roles = guild_configs.roles(interaction.guild_id)
+    key = role_stats_key(interaction.guild.id)
+    embed = embed_cache.get_or_render(key, roles.values(), lambda: render_role_stats_embed(interaction.guild, roles))
+    
+    await interaction.response.send_message(embed=personalize_embed(embed, interaction.user), ephemeral=True)
+
+
+def render_role_stats_embed(guild: discord.Guild, roles: dict) -> discord.Embed:
     embed = discord.Embed(
         title="Role Statistics",
         description="Statistics for manageable roles only",
-        color=discord.Color.gold(),
-        timestamp=discord.utils.utcnow()
+        color=discord.Color.gold()
     )
     
     total_with_roles = 0
     
-    for name, role_id in MANAGEABLE_ROLES.items():
-        role = interaction.guild.get_role(role_id)
+    for name, role_id in roles.items():
+        role = guild.get_role(role_id)
         if role:
-            member_count = len(role.members)
+            member_count = membership_index.count(role_id)
             total_with_roles += member_count
-            percentage = (member_count / interaction.guild.member_count) * 100
+            percentage = (member_count / guild.member_count) * 100
             
             bar_length = int(percentage / 5)
             bar = "█" * bar_length + "░" * (20 - bar_length)
@@ -584,9 +3173,622 @@ async def role_stats(interaction: discord.Interaction):
                 inline=False
             )
     
-    embed.set_footer(text=f"Total: {total_with_roles} members • Requested by {interaction.user.name}")
-    
-    await interaction.response.send_message(embed=embed, ephemeral=True)
+    embed.set_footer(text=f"Total: {total_with_roles} members")
+    return embed
+
+
+def personalize_embed(embed: discord.Embed, user: discord.abc.User) -> discord.Embed:
+    embed.timestamp = discord.utils.utcnow()
+    prefix = f"{embed.footer.text} • " if embed.footer.text else ""
+    embed.set_footer(text=f"{prefix}Requested by {user.name}")
+    return embed
+
+
+def can_browse_members(interaction: discord.Interaction) -> bool:
+    return has_panel_permission(interaction)
+
+
+def member_browser_view(guild: discord.Guild, role_id: int, page: int, prefix: str = "") -> discord.ui.View:
+    last_page = member_browser.page_count(guild, role_id, prefix) - 1
+    view = discord.ui.View(timeout=None)
+    for action, label in (("f", "⏮"), ("p", "◀"), ("n", "▶"), ("l", "⏭")):
+        disabled = page == 0 if action in "fp" else page >= last_page
+        view.add_item(MemberBrowserButton(action, role_id, page, prefix, label, disabled))
+    view.add_item(MemberBrowserButton("j", role_id, page, prefix, "🔢 Jump", last_page == 0))
+    view.add_item(MemberBrowserButton("s", role_id, page, prefix, "🔍 Filter"))
+    view.add_item(MemberBrowserRoleSelect(guild_configs.roles(guild.id), role_id))
+    return view
+
+
+async def show_member_page(interaction: discord.Interaction, role_id: int, page: int, prefix: str = ""):
+    if role_id not in guild_configs.roles(interaction.guild_id).values():
+        await interaction.response.send_message("❌ Role not found in server!", ephemeral=True)
+        return
+    prefix = prefix[:BROWSER_PREFIX_LIMIT]
+    page = min(max(page, 0), member_browser.page_count(interaction.guild, role_id, prefix) - 1)
+    embed = member_browser.render(interaction.guild, interaction.user.id, role_id, page, prefix)
+    await interaction.response.edit_message(
+        content=None,
+        embed=embed,
+        view=member_browser_view(interaction.guild, role_id, page, prefix)
+    )
+
+
+class MemberBrowserJumpModal(discord.ui.Modal, title="Jump to page"):
+    page = discord.ui.TextInput(label="Page number", max_length=6)
+
+    def __init__(self, role_id: int, prefix: str):
+        super().__init__()
+        self.role_id = role_id
+        self.prefix = prefix
+
+    @timed("component")
+    async def on_submit(self, interaction: discord.Interaction):
+        try:
+            page = int(self.page.value) - 1
+        except ValueError:
+            await interaction.response.send_message("❌ Please enter a page number!", ephemeral=True)
+            return
+        await show_member_page(interaction, self.role_id, page, self.prefix)
+
+
+class MemberBrowserFilterModal(discord.ui.Modal, title="Filter members"):
+    prefix = discord.ui.TextInput(
+        label="Name starts with (leave empty for all)",
+        required=False,
+        max_length=BROWSER_PREFIX_LIMIT
+    )
+
+    def __init__(self, role_id: int):
+        super().__init__()
+        self.role_id = role_id
+
+    @timed("component")
+    async def on_submit(self, interaction: discord.Interaction):
+        await show_member_page(interaction, self.role_id, 0, self.prefix.value.strip())
+
+
+class MemberBrowserButton(
+    discord.ui.DynamicItem[discord.ui.Button],
+    template=r"mb:(?P<action>[fpnljs]):(?P<role_id>\d+):(?P<page>\d+):(?P<prefix>.*)"
+):
+    def __init__(self, action: str, role_id: int, page: int, prefix: str = "", label: str = "",
+                 disabled: bool = False):
+        super().__init__(discord.ui.Button(
+            label=label or action,
+            style=discord.ButtonStyle.secondary,
+            custom_id=f"mb:{action}:{role_id}:{page}:{prefix}",
+            disabled=disabled,
+            row=0 if action in "fpnl" else 1
+        ))
+        self.action = action
+        self.role_id = role_id
+        self.page = page
+        self.prefix = prefix
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(match['action'], int(match['role_id']), int(match['page']), match['prefix'], item.label)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if can_browse_members(interaction):
+            return True
+        await interaction.response.send_message(
+            "❌ You need Admin or Helper role to use this command!",
+            ephemeral=True
+        )
+        return False
+
+    @timed("component")
+    async def callback(self, interaction: discord.Interaction):
+        if self.action == "j":
+            await interaction.response.send_modal(MemberBrowserJumpModal(self.role_id, self.prefix))
+            return
+        if self.action == "s":
+            await interaction.response.send_modal(MemberBrowserFilterModal(self.role_id))
+            return
+
+        pages = {
+            "f": 0,
+            "p": self.page - 1,
+            "n": self.page + 1,
+            "l": member_browser.page_count(interaction.guild, self.role_id, self.prefix) - 1,
+        }
+        await show_member_page(interaction, self.role_id, pages[self.action], self.prefix)
+
+
+class MemberBrowserRoleSelect(discord.ui.DynamicItem[discord.ui.Select], template=r"mb:role"):
+    def __init__(self, roles: dict, selected: Optional[int] = None):
+        super().__init__(discord.ui.Select(
+            placeholder="Browse members of a role",
+            custom_id="mb:role",
+            options=[
+                discord.SelectOption(label=name, value=str(role_id), default=role_id == selected)
+                for name, role_id in roles.items()
+            ] or [discord.SelectOption(label="No managed roles", value="0")],
+            row=2
+        ))
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Select, match):
+        return cls(guild_configs.roles(interaction.guild_id))
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if can_browse_members(interaction):
+            return True
+        await interaction.response.send_message(
+            "❌ You need Admin or Helper role to use this command!",
+            ephemeral=True
+        )
+        return False
+
+    @timed("component")
+    async def callback(self, interaction: discord.Interaction):
+        await show_member_page(interaction, int(self.item.values[0]), 0)
+
+
+class RoleHistoryView(discord.ui.View):
+    def __init__(self, requester_id: int, guild_id: int, target_id: Optional[int] = None,
+                 actor_id: Optional[int] = None, role_id: Optional[int] = None):
+        super().__init__(timeout=300)
+        self.requester_id = requester_id
+        self.guild_id = guild_id
+        self.filters = {'target_id': target_id, 'actor_id': actor_id, 'role_id': role_id}
+        self.cursors = [None]
+        self.rows = []
+        self.has_more = False
+
+    async def load_page(self):
+        rows = await audit_log.history(
+            self.guild_id,
+            before_id=self.cursors[-1],
+            limit=HISTORY_PAGE_SIZE + 1,
+            **self.filters
+        )
+        self.has_more = len(rows) > HISTORY_PAGE_SIZE
+        self.rows = rows[:HISTORY_PAGE_SIZE]
+        self.newer.disabled = len(self.cursors) == 1
+        self.older.disabled = not self.has_more
+
+    def build_embed(self) -> discord.Embed:
+        embed = discord.Embed(title="📜 Role History", color=discord.Color.blurple())
+        filters = []
+        if self.filters['target_id']:
+            filters.append(f"Member: <@{self.filters['target_id']}>")
+        if self.filters['actor_id']:
+            filters.append(f"Performed by: <@{self.filters['actor_id']}>")
+        if self.filters['role_id']:
+            filters.append(f"Role: <@&{self.filters['role_id']}>")
+
+        lines = filters + [""] if filters else []
+        for _, created_at, actor_id, target_id, role_id, action, success, detail in self.rows:
+            status = "✅" if success else "❌"
+            verb = "gave" if action == "give" else "removed"
+            lines.append(f"{status} <t:{int(created_at)}:f> <@{actor_id}> {verb} <@&{role_id}> → <@{target_id}>")
+            if detail:
+                lines.append(f"  ↳ {detail}")
+        if not self.rows:
+            lines.append("*No role changes recorded*")
+
+        embed.description = "\n".join(lines)
+        embed.set_footer(text=f"Page {len(self.cursors)}")
+        return embed
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user.id == self.requester_id
+
+    @discord.ui.button(label="◀ Newer", style=discord.ButtonStyle.secondary)
+    @timed("component")
+    async def newer(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.cursors.pop()
+        await self.load_page()
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+    @discord.ui.button(label="Older ▶", style=discord.ButtonStyle.secondary)
+    @timed("component")
+    async def older(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.cursors.append(self.rows[-1][0])
+        await self.load_page()
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+
+@bot.tree.command(name="role_history", description="Show who changed managed roles and when")
+@app_commands.describe(
+    member="Only show changes made to this member",
+    performed_by="Only show changes made by this helper",
+    role="Only show changes to this role"
+)
+@timed("command")
+async def role_history(
+    interaction: discord.Interaction,
+    member: Optional[discord.Member] = None,
+    performed_by: Optional[discord.Member] = None,
+    role: Optional[discord.Role] = None
+):
+    if not has_panel_permission(interaction):
+        await interaction.response.send_message(
+            "❌ You need Admin or Helper role to use this command!",
+            ephemeral=True
+        )
+        return
+
+    view = RoleHistoryView(
+        interaction.user.id,
+        interaction.guild.id,
+        target_id=member.id if member else None,
+        actor_id=performed_by.id if performed_by else None,
+        role_id=role.id if role else None
+    )
+    await view.load_page()
+    await interaction.response.send_message(embed=view.build_embed(), view=view, ephemeral=True)
+
+
+@bot.tree.command(name="schedule_role", description="Schedule a role change or a temporary role grant")
+@app_commands.describe(
+    member="Member to change",
+    role="Managed role to give or remove",
+    action="Give or remove the role",
+    in_hours="Apply the change after this many hours (0 = now)",
+    duration_hours="Remove a given role again after this many hours (0 = permanent)"
+)
+@app_commands.choices(
+    action=[
+        app_commands.Choice(name="Give", value="give"),
+        app_commands.Choice(name="Remove", value="remove")
+    ]
+)
+@timed("command")
+async def schedule_role(
+    interaction: discord.Interaction,
+    member: discord.Member,
+    role: discord.Role,
+    action: app_commands.Choice[str],
+    in_hours: app_commands.Range[float, 0, 8760] = 0.0,
+    duration_hours: app_commands.Range[float, 0, 8760] = 0.0
+):
+    if not has_panel_permission(interaction):
+        await interaction.response.send_message(
+            "❌ You need Admin or Helper role to use this command!",
+            ephemeral=True
+        )
+        return
+
+    if role.id not in guild_configs.roles(interaction.guild_id).values():
+        await interaction.response.send_message(
+            f"❌ {role.mention} is not a managed role!",
+            ephemeral=True
+        )
+        return
+
+    if not has_panel_permission(interaction, role.id):
+        await interaction.response.send_message(
+            f"❌ You are not allowed to manage {role.mention}!",
+            ephemeral=True
+        )
+        return
+
+    if action.value == "remove" and duration_hours:
+        await interaction.response.send_message(
+            "❌ A duration can only be set when giving a role!",
+            ephemeral=True
+        )
+        return
+
+    await interaction.response.defer(ephemeral=True)
+    duration = duration_hours * 3600 or None
+    reason = f"Scheduled by {interaction.user}"
+    item = (member.id, role.id, action.value, duration)
+
+    if not in_hours:
+        await bulk_jobs.submit(interaction.guild.id, interaction.user.id, reason, [item], interaction=interaction)
+        return
+
+    due_at = time.time() + in_hours * 3600
+    await role_scheduler.schedule(
+        interaction.guild.id,
+        interaction.user.id,
+        [(member.id, role.id, action.value, due_at, duration)],
+        reason
+    )
+    duration_text = f" for **{duration_hours:g}h**" if duration else ""
+    await interaction.followup.send(
+        f"⏰ Scheduled **{action.value}** {role.mention} for {member.mention}{duration_text} "
+        f"<t:{int(due_at)}:R>",
+        ephemeral=True
+    )
+
+
+async def read_upload_rows(attachment: discord.Attachment):
+    async with aiohttp.ClientSession() as session:
+        async with session.get(attachment.url) as response:
+            response.raise_for_status()
+            line_number = 0
+            async for raw_line in response.content:
+                line_number += 1
+                line = raw_line.decode('utf-8-sig' if line_number == 1 else 'utf-8', errors='replace').strip()
+                if line and not line.startswith('#'):
+                    yield line_number, [cell.strip() for cell in next(csv.reader([line]))]
+
+
+def parse_upload_role(value: str, default: Optional[int], roles: dict) -> Optional[int]:
+    if not value:
+        return default
+    value = value.strip('<@&>').upper()
+    return next(
+        (role_id for name, role_id in roles.items() if value in (name.upper(), str(role_id))),
+        None
+    )
+
+
+def build_member_name_index(guild: discord.Guild) -> dict:
+    names = {}
+    for member in guild.members:
+        for name in {member.name, member.display_name, member.global_name}:
+            if name:
+                names.setdefault(name.lower(), set()).add(member.id)
+    return names
+
+
+def match_upload_member(guild: discord.Guild, value: str, names: dict):
+    match = re.fullmatch(r"<@!?(\d+)>|(\d{15,20})", value)
+    if match:
+        return int(match[1] or match[2]), None
+    if not names:
+        names.update(build_member_name_index(guild))
+    matches = names.get(value.lstrip('@').lower(), set())
+    if len(matches) == 1:
+        return next(iter(matches)), None
+    return None, "ambiguous name" if len(matches) > 1 else "unknown member"
+
+
+@bot.tree.command(name="bulk_roles", description="Give or remove roles for members listed in a file (Admin only)")
+@app_commands.checks.has_permissions(administrator=True)
+@app_commands.describe(
+    file="CSV/text file, one row per member: member[,role][,action]",
+    role="Role for rows that do not name one",
+    action="Action for rows that do not name one"
+)
+@app_commands.choices(
+    action=[
+        app_commands.Choice(name="Give", value="give"),
+        app_commands.Choice(name="Remove", value="remove")
+    ]
+)
+@timed("command")
+async def bulk_roles(
+    interaction: discord.Interaction,
+    file: discord.Attachment,
+    role: Optional[discord.Role] = None,
+    action: Optional[app_commands.Choice[str]] = None
+):
+    roles = guild_configs.roles(interaction.guild_id)
+    if role is not None and role.id not in roles.values():
+        await interaction.response.send_message(
+            f"❌ {role.mention} is not a managed role!",
+            ephemeral=True
+        )
+        return
+
+    if file.size > BULK_UPLOAD_MAX_BYTES:
+        await interaction.response.send_message(
+            f"❌ File is too large! The limit is {BULK_UPLOAD_MAX_BYTES // 1024} KB.",
+            ephemeral=True
+        )
+        return
+
+    await interaction.response.defer(ephemeral=True)
+    guild = interaction.guild
+    default_role = role.id if role else None
+    default_action = action.value if action else None
+    rows = {}
+    unresolved = []
+    names = {}
+
+    try:
+        async for line_number, cells in read_upload_rows(file):
+            value = cells[0]
+            if line_number == 1 and value.lower() in ('member', 'user', 'user_id', 'id'):
+                continue
+            if len(rows) + len(unresolved) >= BULK_UPLOAD_MAX_ROWS:
+                unresolved.append([line_number, value, None, None, f"row limit of {BULK_UPLOAD_MAX_ROWS} reached"])
+                break
+
+            role_id = parse_upload_role(cells[1] if len(cells) > 1 else "", default_role, roles)
+            row_action = cells[2].lower() if len(cells) > 2 and cells[2] else default_action
+            user_id = None
+            if role_id is None:
+                problem = "unknown role"
+            elif row_action not in ("give", "remove"):
+                problem = "unknown action"
+            else:
+                user_id, problem = match_upload_member(guild, value, names)
+                if problem is None and (user_id, role_id) in rows:
+                    problem = "duplicate row"
+
+            if problem:
+                unresolved.append([line_number, value, role_id, row_action, problem])
+            else:
+                rows[(user_id, role_id)] = row_action
+    except (aiohttp.ClientError, ValueError) as e:
+        await interaction.followup.send(f"❌ Could not read the file: {e}", ephemeral=True)
+        return
+
+    if not rows and not unresolved:
+        await interaction.followup.send("❌ The file does not contain any rows!", ephemeral=True)
+        return
+
+    members = await member_resolver.resolve(guild, list({user_id for user_id, _ in rows}))
+    items, rejected = plan_role_changes(
+        guild,
+        [(user_id, role_id, row_action, None) for (user_id, role_id), row_action in rows.items()],
+        members
+    )
+
+    await bulk_jobs.submit(
+        guild.id,
+        interaction.user.id,
+        f"Bulk upload by {interaction.user}",
+        items,
+        interaction=interaction,
+        rejected=rejected,
+        unresolved=unresolved
+    )
+
+
+def render_reconcile_preview(guild: discord.Guild, diff: dict, approved, rejected, unresolved) -> discord.Embed:
+    embed = discord.Embed(
+        title="📝 Reconcile preview",
+        description=(
+            f"**{len(approved)}** change(s) will be applied, **{len(rejected)}** will be skipped"
+            f" and **{len(unresolved)}** row(s) could not be read."
+        ),
+        color=discord.Color.blurple()
+    )
+    for role_id, (adds, removes, kept) in diff.items():
+        role = guild.get_role(role_id)
+        embed.add_field(
+            name=role.name if role else str(role_id),
+            value=f"➕ {len(adds)}  ➖ {len(removes)}  ✔️ {len(kept)} unchanged",
+            inline=False
+        )
+    if rejected:
+        values = pack_field_values([detail for _, _, _, detail in rejected], EMBED_FIELD_LIMIT - 16)
+        embed.add_field(
+            name=f"⏭️ Skipped ({len(rejected)})",
+            value=values[0] + ("\n*...and more*" if len(values) > 1 else ""),
+            inline=False
+        )
+    if unresolved:
+        values = pack_field_values(
+            [f"line {line_number}: `{value}` ({problem})" for line_number, value, *_, problem in unresolved],
+            EMBED_FIELD_LIMIT - 16
+        )
+        embed.add_field(
+            name=f"❓ Unresolved ({len(unresolved)})",
+            value=values[0] + ("\n*...and more*" if len(values) > 1 else ""),
+            inline=False
+        )
+    return embed
+
+
+@bot.tree.command(name="reconcile_roles", description="Make managed roles match a roster file (Admin only)")
+@app_commands.checks.has_permissions(administrator=True)
+@app_commands.describe(
+    file="CSV/text file, one row per member: member[,role]",
+    role="Role for rows that do not name one",
+    all_roles="Also reconcile managed roles the file does not mention (removes all their members)"
+)
+@timed("command")
+async def reconcile_roles(
+    interaction: discord.Interaction,
+    file: discord.Attachment,
+    role: Optional[discord.Role] = None,
+    all_roles: bool = False
+):
+    roles = guild_configs.roles(interaction.guild_id)
+    if role is not None and role.id not in roles.values():
+        await interaction.response.send_message(
+            f"❌ {role.mention} is not a managed role!",
+            ephemeral=True
+        )
+        return
+
+    if file.size > BULK_UPLOAD_MAX_BYTES:
+        await interaction.response.send_message(
+            f"❌ File is too large! The limit is {BULK_UPLOAD_MAX_BYTES // 1024} KB.",
+            ephemeral=True
+        )
+        return
+
+    guild = interaction.guild
+    if not guild.chunked:
+        await interaction.response.send_message(
+            "❌ The member cache is still loading, try again in a moment!",
+            ephemeral=True
+        )
+        return
+
+    await interaction.response.defer(ephemeral=True)
+    default_role = role.id if role else None
+    desired = {role_id: set() for role_id in roles.values()} if all_roles else {}
+    if default_role is not None:
+        desired.setdefault(default_role, set())
+    unresolved = []
+    names = {}
+    rows = 0
+
+    try:
+        async for line_number, cells in read_upload_rows(file):
+            value = cells[0]
+            if line_number == 1 and value.lower() in ('member', 'user', 'user_id', 'id'):
+                continue
+            if rows >= BULK_UPLOAD_MAX_ROWS:
+                unresolved.append([line_number, value, None, None, f"row limit of {BULK_UPLOAD_MAX_ROWS} reached"])
+                break
+
+            role_id = parse_upload_role(cells[1] if len(cells) > 1 else "", default_role, roles)
+            if role_id is None:
+                unresolved.append([line_number, value, None, None, "unknown role"])
+                continue
+            user_id, problem = match_upload_member(guild, value, names)
+            if problem:
+                unresolved.append([line_number, value, role_id, None, problem])
+            else:
+                rows += 1
+                desired.setdefault(role_id, set()).add(user_id)
+    except (aiohttp.ClientError, ValueError) as e:
+        await interaction.followup.send(f"❌ Could not read the file: {e}", ephemeral=True)
+        return
+
+    if not rows and unresolved:
+        await interaction.followup.send(
+            "❌ None of the rows in the file could be matched!",
+            embed=render_reconcile_preview(guild, {}, [], [], unresolved),
+            ephemeral=True
+        )
+        return
+    if not rows:
+        await interaction.followup.send("❌ The file does not contain any rows!", ephemeral=True)
+        return
+
+    diff = {}
+    items = []
+    for role_id, wanted in desired.items():
+        current = membership_index.members.get(role_id, set())
+        adds, removes = wanted - current, current - wanted
+        diff[role_id] = (adds, removes, wanted & current)
+        items += [(user_id, role_id, "give", None) for user_id in adds]
+        items += [(user_id, role_id, "remove", None) for user_id in removes]
+
+    members = await member_resolver.resolve(guild, list({item[0] for item in items}))
+    approved, rejected = plan_role_changes(guild, items, members)
+    preview = render_reconcile_preview(guild, diff, approved, rejected, unresolved)
+
+    if not approved:
+        await interaction.followup.send("✅ Roles already match the file.", embed=preview, ephemeral=True)
+        return
+
+    preview_view = PlanPreviewView(interaction.user.id)
+    preview_message = await interaction.followup.send(embed=preview, view=preview_view, ephemeral=True, wait=True)
+    await preview_view.wait()
+    if not preview_view.value:
+        await preview_message.edit(content="❌ Action cancelled", embed=preview, view=None)
+        return
+    try:
+        await preview_message.delete()
+    except:
+        pass
+
+    await bulk_jobs.submit(
+        guild.id,
+        interaction.user.id,
+        f"Roster reconcile by {interaction.user}",
+        approved,
+        interaction=interaction,
+        resolved=list(members.values()),
+        rejected=rejected,
+        unresolved=unresolved
+    )
 
 
 @bot.command(name="rek")
@@ -697,8 +3899,15 @@ async def formkuda_command(ctx):
 
 @bot.tree.command(name="delete_panel", description="Delete saved panel message ID (Admin only)")
 @app_commands.checks.has_permissions(administrator=True)
-async def delete_panel(interaction: discord.Interaction):
-    message_id = PanelDataManager.get_message_id()
+@app_commands.describe(panel="Panel to delete (defaults to the main panel)")
+@app_commands.autocomplete(panel=panel_autocomplete)
+@timed("command")
+async def delete_panel(interaction: discord.Interaction, panel: Optional[str] = None):
+    panel = await resolve_panel(interaction, panel)
+    if panel is None:
+        return
+
+    message_id = await panel_data.get_message_id(panel)
     
     if not message_id:
         await interaction.response.send_message(
@@ -707,7 +3916,7 @@ async def delete_panel(interaction: discord.Interaction):
         )
         return
     
-    channel = interaction.guild.get_channel(PANEL_CHANNEL_ID)
+    channel = interaction.guild.get_channel(panel.channel_id)
     if channel:
         try:
             message = await channel.fetch_message(message_id)
@@ -720,7 +3929,7 @@ async def delete_panel(interaction: discord.Interaction):
                 ephemeral=True
             )
     
-    PanelDataManager.set_message_id(None)
+    await panel_data.set_message_id(panel, None)
     await interaction.response.send_message(
         "✅ Panel message ID cleared! Use `/setup_panel` to create a new one.",
         ephemeral=True
@@ -730,14 +3939,20 @@ async def delete_panel(interaction: discord.Interaction):
 @setup_panel.error
 @refresh_panel.error
 @delete_panel.error
+@bulk_roles.error
+@add_managed_role.error
+@remove_managed_role.error
+@rename_managed_role.error
+@reconcile_roles.error
 async def admin_command_error(interaction: discord.Interaction, error):
+    send = interaction.followup.send if interaction.response.is_done() else interaction.response.send_message
     if isinstance(error, app_commands.MissingPermissions):
-        await interaction.response.send_message(
+        await send(
             "❌ You need Administrator permission to use this command!",
             ephemeral=True
         )
     else:
-        await interaction.response.send_message(
+        await send(
             f"❌ An error occurred: {str(error)}",
             ephemeral=True
         )